@@ -0,0 +1,179 @@
+"""Память Redis под задачи напоминаний в прежнем и компактном формате.
+
+Добавляет N задач в BatchRedisJobStore на локальном Redis (из .env)
+сначала в прежнем формате (текст, статус и chat id в kwargs, обычный
+CronTrigger), затем в текущем (ссылка на напоминание, CompactCronTrigger),
+и для каждого печатает прирост used_memory из INFO memory и MEMORY USAGE
+хэша задач и zset времён запуска - то есть вместе с накладными расходами
+на поле хэша и элемент zset.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.job_payload_memory --jobs 100000
+
+Задачи пишутся в отдельные ключи (bench.payload.*), которые удаляются
+после каждого замера. Postgres не нужен: задачи не исполняются.
+"""
+
+import argparse
+import asyncio
+import datetime
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from src.config.main_config import load_config
+from src.services.jobstores import BatchRedisJobStore
+from src.services.scheduler import SchedulerService, send_reminder_job
+from src.utils.datetime_utils import create_trigger_args
+
+JOBS_KEY = "bench.payload.jobs"
+RUN_TIMES_KEY = "bench.payload.run_times"
+# 57 символов кириллицей, как у типичного напоминания
+BENCH_TEXT = "Не забыть позвонить маме и купить продукты на всю неделю!"
+MSK = ZoneInfo("Europe/Moscow")
+
+
+@dataclass
+class MemoryStats:
+    jobs: int
+    seconds: float
+    used_memory: int
+    jobs_key: int
+    run_times_key: int
+
+
+def add_legacy_job(scheduler: AsyncIOScheduler, reminder_id: int, trigger_args):
+    # Как SchedulerService.add_reminder_job создавал задачи до компактного формата
+    job_id = uuid.uuid4().hex
+    scheduler.add_job(
+        func=send_reminder_job,
+        trigger="cron",
+        timezone="Europe/Moscow",
+        id=job_id,
+        name=f"Reminder {reminder_id}",
+        replace_existing=True,
+        kwargs={
+            "tg_user_id": 1_000_000_000 + reminder_id,
+            "reminder_id": reminder_id,
+            "reminder_status": True,
+            "message_text": BENCH_TEXT,
+            "job_id": job_id,
+        },
+        **trigger_args,
+        misfire_grace_time=60 * 5,
+    )
+
+
+async def add_reference_job(
+    scheduler_service: SchedulerService, reminder_id: int, trigger_args
+):
+    await scheduler_service.add_reminder_job(
+        SimpleNamespace(id=reminder_id),
+        1_000_000_000 + reminder_id,
+        "cron",
+        trigger_args,
+    )
+
+
+async def measure(
+    jobstore: BatchRedisJobStore,
+    scheduler: AsyncIOScheduler,
+    payload: str,
+    args: argparse.Namespace,
+) -> MemoryStats:
+    redis = jobstore.redis
+    redis.delete(JOBS_KEY, RUN_TIMES_KEY)
+    used_memory_before = redis.info("memory")["used_memory"]
+    scheduler_service = SchedulerService(scheduler=scheduler)
+    # Время запуска равномерно по суткам, начиная с завтра
+    first_start = datetime.datetime.now(MSK).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) + datetime.timedelta(days=1)
+
+    started_at = time.perf_counter()
+    for reminder_id in range(1, args.jobs + 1):
+        start = first_start + datetime.timedelta(
+            seconds=reminder_id * 86_400 // args.jobs
+        )
+        _, trigger_args = create_trigger_args(args.frequency, start.isoformat())
+        if payload == "legacy":
+            add_legacy_job(scheduler, reminder_id, trigger_args)
+        else:
+            await add_reference_job(scheduler_service, reminder_id, trigger_args)
+    seconds = time.perf_counter() - started_at
+
+    stats = MemoryStats(
+        jobs=redis.hlen(JOBS_KEY),
+        seconds=seconds,
+        used_memory=redis.info("memory")["used_memory"] - used_memory_before,
+        jobs_key=redis.memory_usage(JOBS_KEY, samples=0),
+        run_times_key=redis.memory_usage(RUN_TIMES_KEY, samples=0),
+    )
+    redis.delete(JOBS_KEY, RUN_TIMES_KEY)
+    return stats
+
+
+async def run(args: argparse.Namespace) -> dict[str, MemoryStats]:
+    config = load_config(args.env)
+    jobstore = BatchRedisJobStore(
+        jobs_key=JOBS_KEY,
+        run_times_key=RUN_TIMES_KEY,
+        password=config.redis.password,
+        host=config.redis.host,
+        port=config.redis.port,
+        db=config.redis.database,
+    )
+    if jobstore.redis.exists(JOBS_KEY, RUN_TIMES_KEY):
+        raise RuntimeError("Bench keys from a previous run found, clean them up first.")
+    scheduler = AsyncIOScheduler(
+        jobstores={"default": jobstore}, timezone="Europe/Moscow"
+    )
+    # На паузе задачи только пишутся в jobstore и не исполняются
+    scheduler.start(paused=True)
+    try:
+        return {
+            payload: await measure(jobstore, scheduler, payload, args)
+            for payload in ("legacy", "reference")
+        }
+    finally:
+        scheduler.shutdown(wait=False)
+        jobstore.redis.delete(JOBS_KEY, RUN_TIMES_KEY)
+
+
+def report(args: argparse.Namespace, results: dict[str, MemoryStats]) -> None:
+    print(f"dataset: {args.jobs} {args.frequency} jobs")
+    for payload, stats in results.items():
+        print(
+            f"{payload:<10} used_memory=+{stats.used_memory / 2**20:.1f} MiB "
+            f"({stats.used_memory / stats.jobs:.0f} B/job) "
+            f"jobs hash={stats.jobs_key / 2**20:.1f} MiB "
+            f"run_times zset={stats.run_times_key / 2**20:.1f} MiB "
+            f"added in {stats.seconds:.1f}s"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument(
+        "--frequency", choices=("daily", "weekly", "monthly"), default="daily"
+    )
+    parser.add_argument("--env", default=".env")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.WARNING)
+    args = parse_args()
+    results = asyncio.run(run(args))
+    report(args, results)
+
+
+if __name__ == "__main__":
+    main()
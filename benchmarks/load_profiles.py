@@ -0,0 +1,224 @@
+"""Сравнение числа запросов и объёма строк до и после профилей загрузки.
+
+Создаёт в Postgres из .env пользователей с напоминаниями и прогоняет
+типовые выборки дважды: с прежней загрузкой связей (Reminder.user через
+JOIN, User.reminders через SELECT IN) и с профилями LoadProfile из DAO.
+Печатает число SQL-запросов, полученных строк и ячеек (строки x столбцы).
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.load_profiles --users 200 --reminders-per-user 50
+
+Пользователи создаются с tg_id от BENCH_TG_ID_BASE и удаляются в конце
+вместе с напоминаниями, если не передан --keep.
+"""
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import joinedload, selectinload
+
+from src.config.main_config import load_config
+from src.database.dao.load_profiles import LoadProfile
+from src.database.dao.reminder import ReminderDAO
+from src.database.dao.user import UserDAO
+from src.database.engine import create_pool
+from src.database.models.reminder import Reminder
+from src.database.models.user import User
+from src.enums.reminder import FrequencyType
+
+BENCH_TG_ID_BASE = 9_100_000_000
+
+# Как связи грузились, пока стратегии были зашиты в модели
+LEGACY_REMINDER_OPTIONS = (joinedload(Reminder.user).selectinload(User.reminders),)
+LEGACY_USER_OPTIONS = (selectinload(User.reminders).joinedload(Reminder.user),)
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    rows: int = 0
+    cells: int = 0
+
+
+class QueryCounter:
+    """Считает запросы и строки, которые драйвер вернул на уровне курсора."""
+
+    def __init__(self, engine):
+        self.stats = QueryStats()
+        event.listen(engine.sync_engine, "after_cursor_execute", self._on_execute)
+
+    def reset(self) -> QueryStats:
+        stats, self.stats = self.stats, QueryStats()
+        return stats
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.stats.queries += 1
+        if cursor.description:
+            # Адаптер asyncpg забирает весь результат SELECT сразу после execute
+            rows = len(getattr(cursor, "_rows", ()))
+            self.stats.rows += rows
+            self.stats.cells += rows * len(cursor.description)
+
+
+async def seed(pool, users: int, reminders_per_user: int) -> list[int]:
+    async with pool() as session:
+        user_ids = (
+            await session.scalars(
+                insert(User).returning(User.id),
+                [
+                    {"tg_id": BENCH_TG_ID_BASE + index, "first_name": "bench"}
+                    for index in range(users)
+                ],
+            )
+        ).all()
+        await session.execute(
+            insert(Reminder),
+            [
+                {
+                    "user_id": user_id,
+                    "text": f"bench reminder {index}",
+                    "frequency_type": FrequencyType.DAILY,
+                }
+                for user_id in user_ids
+                for index in range(reminders_per_user)
+            ],
+        )
+        await session.commit()
+    return list(user_ids)
+
+
+async def scenario_list_view(session: AsyncSession, user_ids: list[int], legacy):
+    for user_id in user_ids:
+        if legacy:
+            await session.scalars(
+                select(Reminder)
+                .options(*LEGACY_REMINDER_OPTIONS)
+                .where(Reminder.user_id == user_id, Reminder.is_active == True)
+                .order_by(Reminder.start_datetime.asc())
+            )
+        else:
+            await ReminderDAO(session).get_active_user_reminders(user_id)
+        session.expunge_all()
+
+
+async def scenario_single_reminder(
+    session: AsyncSession, reminder_ids: list[int], legacy
+):
+    for reminder_id in reminder_ids:
+        if legacy:
+            await session.get(Reminder, reminder_id, options=LEGACY_REMINDER_OPTIONS)
+        else:
+            await ReminderDAO(session).get_by_id(reminder_id)
+        session.expunge_all()
+
+
+async def scenario_admin_listing(session: AsyncSession, user_ids: list[int], legacy):
+    options = (
+        LEGACY_USER_OPTIONS
+        if legacy
+        else UserDAO(session).options_for(LoadProfile.ADMIN)
+    )
+    # Тот же запрос, что UserDAO.get_all, но только по bench-пользователям
+    await session.scalars(select(User).options(*options).where(User.id.in_(user_ids)))
+    session.expunge_all()
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, QueryStats]]:
+    config = load_config(args.env)
+    pool: async_sessionmaker[AsyncSession] = create_pool(config.db)
+    engine = pool.kw["bind"]
+    async with pool() as session:
+        stale = await session.scalar(
+            select(User.id).where(User.tg_id >= BENCH_TG_ID_BASE).limit(1)
+        )
+    if stale is not None:
+        raise RuntimeError(
+            "Bench users from a previous run found, clean them up first."
+        )
+
+    user_ids = await seed(pool, args.users, args.reminders_per_user)
+    counter = QueryCounter(engine)
+    results: dict[str, dict[str, QueryStats]] = {}
+    try:
+        async with pool() as session:
+            reminder_ids = (
+                await session.scalars(
+                    select(Reminder.id)
+                    .where(Reminder.user_id.in_(user_ids))
+                    .limit(args.samples)
+                )
+            ).all()
+        sampled_users = user_ids[: args.samples]
+
+        scenarios = {
+            "list view": lambda session, legacy: scenario_list_view(
+                session, sampled_users, legacy
+            ),
+            "single reminder": lambda session, legacy: scenario_single_reminder(
+                session, reminder_ids, legacy
+            ),
+            "admin listing": lambda session, legacy: scenario_admin_listing(
+                session, user_ids, legacy
+            ),
+        }
+        for name, scenario in scenarios.items():
+            results[name] = {}
+            for label, legacy in (("before", True), ("after", False)):
+                async with pool() as session:
+                    counter.reset()
+                    await scenario(session, legacy)
+                    results[name][label] = counter.reset()
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", counter._on_execute)
+        if not args.keep:
+            async with pool() as session:
+                await session.execute(delete(User).where(User.id.in_(user_ids)))
+                await session.commit()
+        await engine.dispose()
+    return results
+
+
+def report(args: argparse.Namespace, results: dict[str, dict[str, QueryStats]]):
+    print(
+        f"dataset: {args.users} users x {args.reminders_per_user} reminders, "
+        f"{args.samples} samples"
+    )
+    for name, by_label in results.items():
+        for label, stats in by_label.items():
+            print(
+                f"{name:<16} {label:<7} queries={stats.queries:<6} "
+                f"rows={stats.rows:<8} cells={stats.cells}"
+            )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--reminders-per-user", type=int, default=50)
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=50,
+        help="сколько выборок списка и одиночного напоминания сделать",
+    )
+    parser.add_argument("--env", default=".env")
+    parser.add_argument(
+        "--keep", action="store_true", help="не удалять созданные данные"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.WARNING)
+    args = parse_args()
+    results = asyncio.run(run(args))
+    report(args, results)
+
+
+if __name__ == "__main__":
+    main()
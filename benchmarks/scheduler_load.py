@@ -0,0 +1,378 @@
+"""Нагрузочный прогон планировщика напоминаний.
+
+Создаёт N напоминаний через ReminderService.create_reminder в локальных
+Postgres и Redis (из .env), дожидается их срабатывания и доставки в
+фейковый Bot внутри процесса и печатает пропускную способность создания,
+перцентили задержки срабатывания, RSS процесса и память Redis.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.scheduler_load --reminders 10000
+    python -m benchmarks.scheduler_load --reminders 100000 --engine database
+
+Задачи пишутся в отдельные ключи Redis (bench.*), пользователи создаются
+с tg_id от BENCH_TG_ID_BASE; всё созданное удаляется в конце, если не
+передан --keep.
+"""
+
+import argparse
+import asyncio
+import datetime
+import logging
+import math
+import re
+import resource
+import statistics
+import time
+from dataclasses import dataclass, field
+from zoneinfo import ZoneInfo
+
+from aiogram.fsm.storage.redis import Redis
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import delete, select
+
+from src import dto
+from src.config.main_config import Config, load_config
+from src.core.context import AppContext
+from src.database.dao.holder import HolderDAO
+from src.database.engine import create_pool
+from src.database.models.reminder import Reminder
+from src.database.models.user import User
+from src.dto.reminder import CreateReminderDTO
+from src.services.delivery import DeliveryQueue
+from src.services.dispatcher import DatabaseSchedulerService, ReminderDispatcher
+from src.services.jobstores import BatchRedisJobStore, HybridJobStore
+from src.services.reminder import ReminderService
+from src.services.reminder_lookup import ReminderLookup
+from src.services.scheduler import ReminderExecutor, SchedulerService
+
+BENCH_TG_ID_BASE = 9_000_000_000
+BENCH_TEXT_PATTERN = re.compile(r"bench:(\d+\.\d+)")
+MSK = ZoneInfo("Europe/Moscow")
+
+
+@dataclass
+class BenchResult:
+    created: int = 0
+    create_failed: int = 0
+    create_seconds: float = 0.0
+    create_latencies: list[float] = field(default_factory=list)
+    fire_lags: list[float] = field(default_factory=list)
+    redis_memory_before: int = 0
+    redis_memory_after: int = 0
+
+
+class FakeBot:
+    """Bot с send_message, который только замеряет задержку относительно плана."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.lags: list[float] = []
+        self.delivered = asyncio.Event()
+        self.expected = 0
+
+    async def send_message(self, chat_id: int, text: str, reply_markup=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        match = BENCH_TEXT_PATTERN.search(text)
+        if match:
+            self.lags.append(time.time() - float(match.group(1)))
+        if len(self.lags) >= self.expected:
+            self.delivered.set()
+
+
+def percentiles(samples: list[float]) -> str:
+    if len(samples) < 2:
+        return "n/a"
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return (
+        f"p50={cuts[49] * 1000:.1f}ms p95={cuts[94] * 1000:.1f}ms "
+        f"p99={cuts[98] * 1000:.1f}ms max={max(samples) * 1000:.1f}ms"
+    )
+
+
+def current_rss_mib() -> float:
+    with open("/proc/self/statm") as statm:
+        resident_pages = int(statm.read().split()[1])
+    return resident_pages * resource.getpagesize() / 2**20
+
+
+def setup_bench_scheduler(config: Config, jobstore_type: str) -> AsyncIOScheduler:
+    redis_config = {
+        "password": config.redis.password,
+        "host": config.redis.host,
+        "port": config.redis.port,
+        "db": config.redis.database,
+    }
+    if jobstore_type == "hybrid":
+        jobstore = HybridJobStore(
+            snapshot_key="bench.snapshot",
+            log_key="bench.log",
+            legacy_jobs_key=None,
+            **redis_config,
+        )
+    else:
+        jobstore = BatchRedisJobStore(
+            jobs_key="bench.jobs", run_times_key="bench.run_times", **redis_config
+        )
+    scheduler = AsyncIOScheduler(
+        jobstores={"default": jobstore},
+        executors={"default": ReminderExecutor()},
+        timezone="Europe/Moscow",
+    )
+    scheduler.start(paused=True)
+    return scheduler
+
+
+async def create_users(pool, count: int) -> list[dto.User]:
+    users = []
+    dao = HolderDAO(pool)
+    try:
+        for index in range(count):
+            users.append(
+                await dao.user.upsert_user(
+                    dto.User(
+                        tg_id=BENCH_TG_ID_BASE + index,
+                        first_name="bench",
+                        is_bot=False,
+                    )
+                )
+            )
+        await dao.commit()
+    finally:
+        await dao.close()
+    return users
+
+
+async def create_reminders(
+    pool,
+    reminder_service: ReminderService,
+    scheduler_service: SchedulerService,
+    users: list[dto.User],
+    args: argparse.Namespace,
+    result: BenchResult,
+) -> None:
+    # Срабатывания равномерно распределены по окну после --lead секунд
+    first_fire = time.time() + args.lead
+    step = args.fire_window / args.reminders
+    indexes = iter(range(args.reminders))
+
+    async def create_one(index: int) -> None:
+        # Cron-триггер срабатывает в целые секунды
+        fire_at = float(math.ceil(first_fire + index * step))
+        user = users[index % len(users)]
+        reminder_dto = CreateReminderDTO(
+            db_user_id=user.db_id,
+            tg_user_id=user.tg_id,
+            text=f"bench:{fire_at:.6f}",
+            frequency_type="daily",
+            start_datetime=datetime.datetime.fromtimestamp(fire_at, MSK).isoformat(),
+        )
+        started_at = time.perf_counter()
+        dao = HolderDAO(pool)
+        try:
+            reminder = await reminder_service.create_reminder(
+                scheduler_service, dao, reminder_dto
+            )
+        finally:
+            await dao.close()
+        result.create_latencies.append(time.perf_counter() - started_at)
+        if reminder is None:
+            result.create_failed += 1
+        else:
+            result.created += 1
+
+    async def worker() -> None:
+        # Общий итератор: корутина на напоминание создаётся только при записи
+        for index in indexes:
+            await create_one(index)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    result.create_seconds = time.perf_counter() - started_at
+    if time.time() > first_fire:
+        logging.warning(
+            "Creation took longer than --lead: early reminders fired late or misfired, "
+            "pass a larger --lead or --create-rate."
+        )
+
+
+async def cleanup(
+    pool,
+    scheduler: AsyncIOScheduler,
+    reminder_lookup: ReminderLookup,
+    users: list[dto.User],
+) -> None:
+    scheduler.remove_all_jobs()
+    user_ids = [user.db_id for user in users]
+    async with pool() as session:
+        reminder_ids = (
+            await session.scalars(
+                select(Reminder.id).where(Reminder.user_id.in_(user_ids))
+            )
+        ).all()
+        await reminder_lookup.invalidate(*reminder_ids)
+        await session.execute(delete(Reminder).where(Reminder.user_id.in_(user_ids)))
+        await session.execute(delete(User).where(User.id.in_(user_ids)))
+        await session.commit()
+
+
+async def run(args: argparse.Namespace) -> BenchResult:
+    config = load_config(args.env)
+    pool = create_pool(config.db)
+    async with pool() as session:
+        stale = await session.scalar(
+            select(User.id).where(User.tg_id >= BENCH_TG_ID_BASE).limit(1)
+        )
+    if stale is not None:
+        raise RuntimeError(
+            "Bench users from a previous run found, clean them up first."
+        )
+
+    redis = Redis(
+        host=config.redis.host,
+        port=config.redis.port,
+        password=config.redis.password,
+        db=config.redis.database,
+    )
+    scheduler = setup_bench_scheduler(config, args.jobstore)
+    jobstore = scheduler._lookup_jobstore("default")
+    result = BenchResult(
+        redis_memory_before=jobstore.redis.info("memory")["used_memory"]
+    )
+
+    bot = FakeBot(latency=args.send_latency / 1000)
+    bot.expected = args.reminders
+    delivery_queue = DeliveryQueue(
+        bot=bot,
+        global_rate=args.send_rate,
+        per_chat_interval=0,
+        workers=args.delivery_workers,
+        max_size=max(args.reminders, 100_000),
+    )
+    delivery_queue.start()
+    AppContext.set_bot(bot)
+    AppContext.set_scheduler(scheduler)
+    AppContext.set_delivery_queue(delivery_queue)
+    AppContext.set_reminder_lookup(ReminderLookup(pool=pool, redis=redis))
+
+    dispatcher = None
+    if args.engine == "database":
+        scheduler_service = DatabaseSchedulerService(scheduler=scheduler)
+        dispatcher = ReminderDispatcher(pool=pool, delivery_queue=delivery_queue)
+        dispatcher.start()
+    else:
+        scheduler_service = SchedulerService(scheduler=scheduler)
+        scheduler.resume()
+    reminder_lookup = AppContext.get_reminder_lookup()
+    reminder_service = ReminderService(
+        scheduler_service=scheduler_service, reminder_lookup=reminder_lookup
+    )
+
+    users = await create_users(pool, args.users)
+    try:
+        await create_reminders(
+            pool, reminder_service, scheduler_service, users, args, result
+        )
+        result.redis_memory_after = jobstore.redis.info("memory")["used_memory"]
+        bot.expected = result.created
+        timeout = args.lead + args.fire_window + args.grace
+        try:
+            await asyncio.wait_for(bot.delivered.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logging.warning(
+                f"Only {len(bot.lags)} of {result.created} reminders delivered in time."
+            )
+        result.fire_lags = bot.lags
+    finally:
+        if dispatcher is not None:
+            await dispatcher.stop()
+        await delivery_queue.stop()
+        if not args.keep:
+            await cleanup(pool, scheduler, reminder_lookup, users)
+        scheduler.shutdown(wait=False)
+        if not args.keep and isinstance(jobstore, HybridJobStore):
+            # remove_all_jobs только дописывает "clear" в журнал
+            jobstore.redis.delete(jobstore.snapshot_key, jobstore.log_key)
+        await redis.aclose()
+    return result
+
+
+def report(args: argparse.Namespace, result: BenchResult) -> None:
+    print(f"engine:           {args.engine} (jobstore: {args.jobstore})")
+    print(
+        f"reminders:        {result.created} created, {result.create_failed} failed, "
+        f"{args.users} users"
+    )
+    print(
+        f"create:           {result.created / result.create_seconds:.1f} reminders/s "
+        f"({percentiles(result.create_latencies)})"
+    )
+    print(
+        f"fire lag:         {len(result.fire_lags)} delivered "
+        f"({percentiles(result.fire_lags)})"
+    )
+    print(
+        f"rss:              {current_rss_mib():.1f} MiB now, "
+        f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB peak"
+    )
+    print(
+        f"redis memory:     "
+        f"+{(result.redis_memory_after - result.redis_memory_before) / 2**20:.1f} MiB "
+        f"({result.redis_memory_after / 2**20:.1f} MiB used)"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument(
+        "--engine", choices=("apscheduler", "database"), default="apscheduler"
+    )
+    parser.add_argument("--jobstore", choices=("redis", "hybrid"), default="redis")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--lead",
+        type=float,
+        default=None,
+        help="секунд до первого срабатывания; по умолчанию время создания "
+        "при --create-rate плюс 60 с, но не меньше 120 с",
+    )
+    parser.add_argument(
+        "--create-rate",
+        type=float,
+        default=100,
+        help="ожидаемая скорость создания (напоминаний/с) для --lead по умолчанию",
+    )
+    parser.add_argument(
+        "--fire-window",
+        type=float,
+        default=60,
+        help="окно, по которому распределены срабатывания",
+    )
+    parser.add_argument("--grace", type=float, default=60)
+    parser.add_argument("--send-rate", type=float, default=10_000)
+    parser.add_argument(
+        "--send-latency", type=float, default=0, help="мс на один send_message"
+    )
+    parser.add_argument("--delivery-workers", type=int, default=32)
+    parser.add_argument("--env", default=".env")
+    parser.add_argument(
+        "--keep", action="store_true", help="не удалять созданные данные"
+    )
+    args = parser.parse_args()
+    if args.lead is None:
+        args.lead = max(120, args.reminders / args.create_rate + 60)
+    return args
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.WARNING)
+    args = parse_args()
+    result = asyncio.run(run(args))
+    report(args, result)
+
+
+if __name__ == "__main__":
+    main()
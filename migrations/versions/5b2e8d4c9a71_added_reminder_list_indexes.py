@@ -0,0 +1,41 @@
+"""Added reminder list indexes
+
+Revision ID: 5b2e8d4c9a71
+Revises: 7f1569274c36
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2e8d4c9a71"
+down_revision: Union[str, None] = "7f1569274c36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix__reminders_user_id_is_active_start_datetime_id",
+        "reminders",
+        ["user_id", "is_active", "start_datetime", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix__reminders_user_id_start_datetime_id",
+        "reminders",
+        ["user_id", "start_datetime", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix__reminders_user_id_start_datetime_id", table_name="reminders")
+    op.drop_index(
+        "ix__reminders_user_id_is_active_start_datetime_id", table_name="reminders"
+    )
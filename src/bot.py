@@ -4,7 +4,7 @@ from aiogram import Bot, Dispatcher
 
 from src.config.main_config import load_config
 from src.core.setup import setup_full_app, setup_scheduler, setup_storage
-from src.database.engine import create_pool
+from src.database.engine import create_pool, create_replica_pool
 
 
 async def main() -> None:
@@ -13,6 +13,7 @@ async def main() -> None:
     bot = Bot(token=config.tg_bot.token)
     dp = Dispatcher(storage=storage)
     pool = create_pool(config.db)
+    replica_pool = create_replica_pool(config.db)
     scheduler = setup_scheduler(config=config)
 
     await setup_full_app(
@@ -22,6 +23,7 @@ async def main() -> None:
         bot_config=config,
         redis=storage.redis,
         scheduler=scheduler,
+        replica_pool=replica_pool,
     )
 
 
@@ -26,6 +26,30 @@ class DbConfig:
     database: str
     host: str
     port: int = 5432
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = 30 * 60
+    pool_pre_ping: bool = True
+    # Таймаут запроса на стороне Postgres, мс (0 - без ограничения)
+    statement_timeout: int = 30_000
+    statement_cache_size: int = 100
+    # PgBouncer в режиме transaction: без кэша prepared statements и
+    # без параметров сессии при подключении
+    pgbouncer: bool = False
+    # Реплика для чтения списков и статистики; пусто - всё читается с primary
+    replica_host: Optional[str] = None
+    replica_port: Optional[int] = None
+    read_your_writes_window: float = 5.0
+    # Запросы дольше порога (мс) пишутся в лог; 0 - не писать
+    slow_query_threshold: int = 200
+    # Столько одинаковых запросов за апдейт считаются признаком N+1; 0 - не искать
+    n_plus_one_threshold: int = 5
+    # Окно (мс), за которое upsert пользователей из разных апдейтов
+    # собираются в один запрос; 0 - каждый апдейт пишет сам
+    user_upsert_batch_delay: int = 5
+    # Один commit на апдейт в DBMiddleware вместо commit в каждом сервисе
+    unit_of_work: bool = False
 
     def create_uri(
         self, driver: str = "asyncpg", host: str = None, port: int = None
@@ -46,9 +70,43 @@ class DbConfig:
         user = env.str("POSTGRES_USER")
         database = env.str("POSTGRES_DB")
         port = env.int("DB_PORT", 5432)
+        pool_size = env.int("DB_POOL_SIZE", 10)
+        max_overflow = env.int("DB_MAX_OVERFLOW", 10)
+        pool_timeout = env.float("DB_POOL_TIMEOUT", 30)
+        pool_recycle = env.int("DB_POOL_RECYCLE", 30 * 60)
+        pool_pre_ping = env.bool("DB_POOL_PRE_PING", True)
+        statement_timeout = env.int("DB_STATEMENT_TIMEOUT", 30_000)
+        statement_cache_size = env.int("DB_STATEMENT_CACHE_SIZE", 100)
+        pgbouncer = env.bool("DB_PGBOUNCER", False)
+        replica_host = env.str("DB_REPLICA_HOST", None)
+        replica_port = env.int("DB_REPLICA_PORT", None)
+        read_your_writes_window = env.float("DB_READ_YOUR_WRITES_WINDOW", 5.0)
+        slow_query_threshold = env.int("DB_SLOW_QUERY_MS", 200)
+        n_plus_one_threshold = env.int("DB_N_PLUS_ONE_THRESHOLD", 5)
+        user_upsert_batch_delay = env.int("DB_USER_UPSERT_BATCH_DELAY_MS", 5)
+        unit_of_work = env.bool("DB_UNIT_OF_WORK", False)
 
         return DbConfig(
-            host=host, password=password, user=user, database=database, port=port
+            host=host,
+            password=password,
+            user=user,
+            database=database,
+            port=port,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            statement_timeout=statement_timeout,
+            statement_cache_size=statement_cache_size,
+            pgbouncer=pgbouncer,
+            replica_host=replica_host,
+            replica_port=replica_port,
+            read_your_writes_window=read_your_writes_window,
+            slow_query_threshold=slow_query_threshold,
+            n_plus_one_threshold=n_plus_one_threshold,
+            user_upsert_batch_delay=user_upsert_batch_delay,
+            unit_of_work=unit_of_work,
         )
 
 
@@ -58,6 +116,8 @@ class RedisConfig:
     password: Optional[str]
     port: Optional[int]
     database: Optional[int]
+    # Срок жизни отрисованной страницы списка напоминаний, 0 - без кэша
+    reminder_page_ttl: int = 10 * 60
 
     def create_uri(self) -> str:
         return f"redis://:{self.password}@{self.host}:{self.port}/{self.database}"
@@ -68,20 +128,123 @@ class RedisConfig:
         port = env.int("REDIS_PORT")
         host = env.str("REDIS_HOST")
         database = env.int("REDIS_DB")
+        reminder_page_ttl = env.int("REDIS_REMINDER_PAGE_TTL", 10 * 60)
 
         return RedisConfig(
             password=password,
             port=port,
             host=host,
             database=database,
+            reminder_page_ttl=reminder_page_ttl,
         )
 
 
+@dataclass
+class SchedulerConfig:
+    # "apscheduler" - задачи в RedisJobStore, "database" - очередь в таблице reminders
+    engine: str = "apscheduler"
+    # "redis" - RedisJobStore, "hybrid" - задачи в памяти с журналом в Redis
+    jobstore: str = "redis"
+    cluster_mode: bool = False
+    lease_key: str = "alert_bot:scheduler:leader"
+    lease_ttl: int = 15
+    heartbeat_interval: float = 3.0
+    dispatch_batch_size: int = 100
+    dispatch_poll_interval: float = 1.0
+    dispatch_workers: int = 1
+    # Досылка пропущенного за время простоя: сообщений в секунду и порог сводки
+    catch_up_enabled: bool = True
+    catch_up_rate: float = 5.0
+    catch_up_coalesce_threshold: int = 3
+    next_run_time_flush_interval: float = 5.0
+
+    @property
+    def uses_database_queue(self) -> bool:
+        return self.engine == "database"
+
+    @staticmethod
+    def load_from_env(env: Env):
+        engine = env.str("SCHEDULER_ENGINE", "apscheduler")
+        jobstore = env.str("SCHEDULER_JOBSTORE", "redis")
+        cluster_mode = env.bool("SCHEDULER_CLUSTER_MODE", False)
+        lease_key = env.str("SCHEDULER_LEASE_KEY", "alert_bot:scheduler:leader")
+        lease_ttl = env.int("SCHEDULER_LEASE_TTL", 15)
+        heartbeat_interval = env.float("SCHEDULER_HEARTBEAT_INTERVAL", 3.0)
+        dispatch_batch_size = env.int("DISPATCH_BATCH_SIZE", 100)
+        dispatch_poll_interval = env.float("DISPATCH_POLL_INTERVAL", 1.0)
+        dispatch_workers = env.int("DISPATCH_WORKERS", 1)
+        catch_up_enabled = env.bool("SCHEDULER_CATCH_UP", True)
+        catch_up_rate = env.float("SCHEDULER_CATCH_UP_RATE", 5.0)
+        catch_up_coalesce_threshold = env.int(
+            "SCHEDULER_CATCH_UP_COALESCE_THRESHOLD", 3
+        )
+        next_run_time_flush_interval = env.float("NEXT_RUN_TIME_FLUSH_INTERVAL", 5.0)
+
+        return SchedulerConfig(
+            engine=engine,
+            jobstore=jobstore,
+            cluster_mode=cluster_mode,
+            lease_key=lease_key,
+            lease_ttl=lease_ttl,
+            heartbeat_interval=heartbeat_interval,
+            dispatch_batch_size=dispatch_batch_size,
+            dispatch_poll_interval=dispatch_poll_interval,
+            dispatch_workers=dispatch_workers,
+            catch_up_enabled=catch_up_enabled,
+            catch_up_rate=catch_up_rate,
+            catch_up_coalesce_threshold=catch_up_coalesce_threshold,
+            next_run_time_flush_interval=next_run_time_flush_interval,
+        )
+
+
+@dataclass
+class DeliveryConfig:
+    global_rate: float = 30
+    per_chat_interval: float = 1.0
+    workers: int = 8
+    max_queue_size: int = 100_000
+    max_attempts: int = 5
+
+    @staticmethod
+    def load_from_env(env: Env):
+        global_rate = env.float("DELIVERY_GLOBAL_RATE", 30)
+        per_chat_interval = env.float("DELIVERY_PER_CHAT_INTERVAL", 1.0)
+        workers = env.int("DELIVERY_WORKERS", 8)
+        max_queue_size = env.int("DELIVERY_MAX_QUEUE_SIZE", 100_000)
+        max_attempts = env.int("DELIVERY_MAX_ATTEMPTS", 5)
+
+        return DeliveryConfig(
+            global_rate=global_rate,
+            per_chat_interval=per_chat_interval,
+            workers=workers,
+            max_queue_size=max_queue_size,
+            max_attempts=max_attempts,
+        )
+
+
+@dataclass
+class MetricsConfig:
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 9101
+
+    @staticmethod
+    def load_from_env(env: Env):
+        enabled = env.bool("METRICS_ENABLED", False)
+        host = env.str("METRICS_HOST", "127.0.0.1")
+        port = env.int("METRICS_PORT", 9101)
+
+        return MetricsConfig(enabled=enabled, host=host, port=port)
+
+
 @dataclass
 class Config:
     tg_bot: TgBot
     db: Optional[DbConfig]
     redis: Optional[RedisConfig] = None
+    scheduler: Optional[SchedulerConfig] = None
+    delivery: Optional[DeliveryConfig] = None
+    metrics: Optional[MetricsConfig] = None
 
 
 def _get_environment(path: str | None = None) -> Env:
@@ -98,6 +261,9 @@ def load_config(path: str | None) -> Config:
         tg_bot=TgBot.load_from_env(env),
         redis=RedisConfig.load_from_env(env),
         db=DbConfig.load_from_env(env),
+        scheduler=SchedulerConfig.load_from_env(env),
+        delivery=DeliveryConfig.load_from_env(env),
+        metrics=MetricsConfig.load_from_env(env),
     )
 
     return config
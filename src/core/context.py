@@ -4,6 +4,10 @@ from typing import Optional
 from aiogram import Bot
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from src.services.delivery import DeliveryQueue
+from src.services.next_run_time_writer import NextRunTimeWriter
+from src.services.reminder_lookup import ReminderLookup
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,6 +16,9 @@ class AppContext:
 
     _bot: Optional[Bot] = None
     _scheduler: Optional[AsyncIOScheduler] = None
+    _delivery_queue: Optional[DeliveryQueue] = None
+    _reminder_lookup: Optional[ReminderLookup] = None
+    _next_run_time_writer: Optional[NextRunTimeWriter] = None
     # Можно добавить другие ресурсы: db_pool, etc.
 
     @classmethod
@@ -40,3 +47,41 @@ class AppContext:
                 "AppContext: Scheduler instance has not been initialized."
             )
         return cls._scheduler
+
+    @classmethod
+    def set_delivery_queue(cls, delivery_queue_instance: DeliveryQueue):
+        logger.info("Delivery queue instance set in AppContext.")
+        cls._delivery_queue = delivery_queue_instance
+
+    @classmethod
+    def get_delivery_queue(cls) -> DeliveryQueue:
+        if cls._delivery_queue is None:
+            logger.critical("Attempted to get Delivery queue before it was set.")
+            raise RuntimeError(
+                "AppContext: Delivery queue instance has not been initialized."
+            )
+        return cls._delivery_queue
+
+    @classmethod
+    def set_reminder_lookup(cls, reminder_lookup_instance: ReminderLookup):
+        logger.info("Reminder lookup instance set in AppContext.")
+        cls._reminder_lookup = reminder_lookup_instance
+
+    @classmethod
+    def get_reminder_lookup(cls) -> ReminderLookup:
+        if cls._reminder_lookup is None:
+            logger.critical("Attempted to get Reminder lookup before it was set.")
+            raise RuntimeError(
+                "AppContext: Reminder lookup instance has not been initialized."
+            )
+        return cls._reminder_lookup
+
+    @classmethod
+    def set_next_run_time_writer(cls, next_run_time_writer_instance: NextRunTimeWriter):
+        logger.info("Next run time writer instance set in AppContext.")
+        cls._next_run_time_writer = next_run_time_writer_instance
+
+    @classmethod
+    def get_next_run_time_writer(cls) -> Optional[NextRunTimeWriter]:
+        # Не обязателен: при очереди в БД next_run_time пишет диспетчер
+        return cls._next_run_time_writer
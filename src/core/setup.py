@@ -7,8 +7,8 @@ from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.fsm.storage.redis import DefaultKeyBuilder, Redis, RedisStorage
 from aiogram.types import BotCommand
-from apscheduler.jobstores.redis import RedisJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from prometheus_client import REGISTRY
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.config.main_config import Config
@@ -21,12 +21,32 @@ from src.handlers import (
     test_handlers,
     view_created_reminders,
 )
+from src.database.instrumentation import QueryInstrumentation
+from src.database.routing import RecentWriteTracker
 from src.middlewares.config import ConfigMiddleware
 from src.middlewares.data_loader import LoadDataMiddleware
-from src.middlewares.database import DBMiddleware
+from src.middlewares.database import (
+    DBMiddleware,
+    QueryStatsHandlerMiddleware,
+    ReleaseConnectionRequestMiddleware,
+)
 from src.middlewares.redis import RedisMiddleware
+from src.services.catchup import ReminderCatchUp
+from src.services.delivery import DeliveryQueue
+from src.services.dispatcher import DatabaseSchedulerService, ReminderDispatcher
+from src.services.jobstores import BatchRedisJobStore, HybridJobStore
+from src.services.metrics import (
+    MetricsServer,
+    RuntimeCollector,
+    setup_scheduler_metrics,
+)
+from src.services.next_run_time_writer import NextRunTimeWriter
 from src.services.reminder import ReminderService
-from src.services.scheduler import SchedulerService
+from src.services.reminder_lookup import ReminderLookup
+from src.services.reminder_page_cache import ReminderPageCache
+from src.services.scheduler import ReminderExecutor, SchedulerService
+from src.services.scheduler_cluster import SchedulerLeaderElector
+from src.services.user_upsert_batcher import UserUpsertBatcher
 
 
 async def setup_full_app(
@@ -36,17 +56,56 @@ async def setup_full_app(
     bot_config: Config,
     redis: Redis,
     scheduler: AsyncIOScheduler,
+    replica_pool: async_sessionmaker[AsyncSession] | None = None,
 ):
     setup_timezone()
     setup_logging()
-    setup_global_dependencies(bot, scheduler)
-    setup_services(dp, scheduler)
-    setup_middlewares(dp, pool, bot_config, redis)
+    delivery_queue = setup_delivery_queue(bot_config, bot)
+    reminder_lookup = ReminderLookup(pool=pool, redis=redis)
+    next_run_time_writer = setup_next_run_time_writer(bot_config, pool)
+    setup_global_dependencies(
+        bot, scheduler, delivery_queue, reminder_lookup, next_run_time_writer
+    )
+    reminder_page_cache = setup_reminder_page_cache(bot_config, redis)
+    setup_services(
+        dp,
+        scheduler,
+        bot_config,
+        reminder_lookup,
+        next_run_time_writer,
+        reminder_page_cache,
+    )
+    upsert_batcher = setup_user_upsert_batcher(bot_config, pool)
+    setup_middlewares(dp, bot, pool, bot_config, redis, replica_pool, upsert_batcher)
     setup_handlers(dp)
+    catch_up = setup_catch_up(
+        bot_config, scheduler, reminder_lookup, delivery_queue, next_run_time_writer
+    )
+    leader_elector = setup_scheduler_cluster(bot_config, scheduler, redis, catch_up)
+    await resume_scheduler(bot_config, scheduler, catch_up)
+    dispatcher = setup_dispatcher(bot_config, pool, delivery_queue)
+    metrics_server = await setup_metrics(
+        bot_config, scheduler, delivery_queue, pool, replica_pool
+    )
 
     await setup_commands(bot)
     await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        if leader_elector is not None:
+            await leader_elector.stop()
+        elif catch_up is not None:
+            await catch_up.stop()
+        if dispatcher is not None:
+            await dispatcher.stop()
+        await delivery_queue.stop()
+        if next_run_time_writer is not None:
+            await next_run_time_writer.stop()
+        if upsert_batcher is not None:
+            await upsert_batcher.stop()
+        if metrics_server is not None:
+            await metrics_server.stop()
 
 
 async def setup_commands(bot: Bot):
@@ -58,9 +117,19 @@ async def setup_commands(bot: Bot):
     await bot.set_my_commands(commands)
 
 
-def setup_global_dependencies(bot: Bot, scheduler: AsyncIOScheduler) -> None:
+def setup_global_dependencies(
+    bot: Bot,
+    scheduler: AsyncIOScheduler,
+    delivery_queue: DeliveryQueue,
+    reminder_lookup: ReminderLookup,
+    next_run_time_writer: NextRunTimeWriter | None,
+) -> None:
     AppContext.set_bot(bot)
     AppContext.set_scheduler(scheduler)
+    AppContext.set_delivery_queue(delivery_queue)
+    AppContext.set_reminder_lookup(reminder_lookup)
+    if next_run_time_writer is not None:
+        AppContext.set_next_run_time_writer(next_run_time_writer)
 
 
 def setup_timezone():
@@ -77,15 +146,36 @@ def setup_logging():
     logger.level = logging.INFO
 
 
-def setup_services(dp: Dispatcher, scheduler: AsyncIOScheduler) -> None:
+def setup_services(
+    dp: Dispatcher,
+    scheduler: AsyncIOScheduler,
+    config: Config,
+    reminder_lookup: ReminderLookup,
+    next_run_time_writer: NextRunTimeWriter | None = None,
+    reminder_page_cache: ReminderPageCache | None = None,
+) -> None:
 
-    scheduler_service = SchedulerService(scheduler=scheduler)
-    reminder_service = ReminderService(scheduler_service=SchedulerService)
+    if config.scheduler.uses_database_queue:
+        scheduler_service = DatabaseSchedulerService(scheduler=scheduler)
+    else:
+        scheduler_service = SchedulerService(scheduler=scheduler)
+    reminder_service = ReminderService(
+        scheduler_service=scheduler_service,
+        reminder_lookup=reminder_lookup,
+        next_run_time_writer=next_run_time_writer,
+        page_cache=reminder_page_cache,
+    )
     dp.workflow_data.update(
         scheduler_service=scheduler_service, reminder_service=reminder_service
     )
 
 
+def setup_reminder_page_cache(config: Config, redis: Redis) -> ReminderPageCache | None:
+    if not config.redis.reminder_page_ttl:
+        return None
+    return ReminderPageCache(redis=redis, ttl=config.redis.reminder_page_ttl)
+
+
 def setup_scheduler(config: Config) -> AsyncIOScheduler:
 
     redis_jobstore_config = {
@@ -94,12 +184,154 @@ def setup_scheduler(config: Config) -> AsyncIOScheduler:
         "port": config.redis.port,
         "db": config.redis.database,
     }
-    jobstores = {"default": RedisJobStore(**redis_jobstore_config)}
-    scheduler = AsyncIOScheduler(jobstores=jobstores, timezone="Europe/Moscow")
-    scheduler.start()
+    if config.scheduler.jobstore == "hybrid":
+        if config.scheduler.cluster_mode:
+            raise ValueError(
+                "SCHEDULER_JOBSTORE=hybrid keeps jobs in one process "
+                "and cannot be used with SCHEDULER_CLUSTER_MODE"
+            )
+        jobstore = HybridJobStore(**redis_jobstore_config)
+    else:
+        jobstore = BatchRedisJobStore(**redis_jobstore_config)
+    jobstores = {"default": jobstore}
+    executors = {"default": ReminderExecutor()}
+    scheduler = AsyncIOScheduler(
+        jobstores=jobstores, executors=executors, timezone="Europe/Moscow"
+    )
+    # Планировщик возобновляется после разбора пропущенного за время простоя
+    # (resume_scheduler) или при получении лидерства в кластерном режиме,
+    # а при очереди в БД задачи из jobstore не исполняются вовсе
+    setup_scheduler_metrics(scheduler)
+    scheduler.start(paused=True)
     return scheduler
 
 
+def setup_catch_up(
+    config: Config,
+    scheduler: AsyncIOScheduler,
+    reminder_lookup: ReminderLookup,
+    delivery_queue: DeliveryQueue,
+    next_run_time_writer: NextRunTimeWriter | None = None,
+) -> ReminderCatchUp | None:
+    if not config.scheduler.catch_up_enabled or config.scheduler.uses_database_queue:
+        return None
+
+    return ReminderCatchUp(
+        scheduler=scheduler,
+        scheduler_service=SchedulerService(scheduler=scheduler),
+        reminder_lookup=reminder_lookup,
+        delivery_queue=delivery_queue,
+        rate=config.scheduler.catch_up_rate,
+        coalesce_threshold=config.scheduler.catch_up_coalesce_threshold,
+        next_run_time_writer=next_run_time_writer,
+    )
+
+
+async def resume_scheduler(
+    config: Config,
+    scheduler: AsyncIOScheduler,
+    catch_up: ReminderCatchUp | None,
+) -> None:
+    if config.scheduler.cluster_mode or config.scheduler.uses_database_queue:
+        return
+
+    if catch_up is not None:
+        try:
+            await catch_up.run()
+        except Exception as e:
+            logging.getLogger(__name__).error(
+                f"Scheduler catch-up failed: {e}", exc_info=True
+            )
+    scheduler.resume()
+
+
+def setup_scheduler_cluster(
+    config: Config,
+    scheduler: AsyncIOScheduler,
+    redis: Redis,
+    catch_up: ReminderCatchUp | None = None,
+) -> SchedulerLeaderElector | None:
+    if not config.scheduler.cluster_mode or config.scheduler.uses_database_queue:
+        return None
+
+    leader_elector = SchedulerLeaderElector(
+        scheduler=scheduler, redis=redis, config=config.scheduler, catch_up=catch_up
+    )
+    leader_elector.start()
+    return leader_elector
+
+
+def setup_next_run_time_writer(
+    config: Config, pool: async_sessionmaker[AsyncSession]
+) -> NextRunTimeWriter | None:
+    # При очереди в БД next_run_time обновляется в транзакции диспетчера
+    if config.scheduler.uses_database_queue:
+        return None
+
+    next_run_time_writer = NextRunTimeWriter(
+        pool=pool, flush_interval=config.scheduler.next_run_time_flush_interval
+    )
+    next_run_time_writer.start()
+    return next_run_time_writer
+
+
+def setup_delivery_queue(config: Config, bot: Bot) -> DeliveryQueue:
+    delivery_queue = DeliveryQueue(
+        bot=bot,
+        global_rate=config.delivery.global_rate,
+        per_chat_interval=config.delivery.per_chat_interval,
+        workers=config.delivery.workers,
+        max_size=config.delivery.max_queue_size,
+        max_attempts=config.delivery.max_attempts,
+    )
+    delivery_queue.start()
+    return delivery_queue
+
+
+def setup_dispatcher(
+    config: Config,
+    pool: async_sessionmaker[AsyncSession],
+    delivery_queue: DeliveryQueue,
+) -> ReminderDispatcher | None:
+    if not config.scheduler.uses_database_queue:
+        return None
+
+    dispatcher = ReminderDispatcher(
+        pool=pool,
+        delivery_queue=delivery_queue,
+        batch_size=config.scheduler.dispatch_batch_size,
+        poll_interval=config.scheduler.dispatch_poll_interval,
+        workers=config.scheduler.dispatch_workers,
+    )
+    dispatcher.start()
+    return dispatcher
+
+
+async def setup_metrics(
+    config: Config,
+    scheduler: AsyncIOScheduler,
+    delivery_queue: DeliveryQueue,
+    pool: async_sessionmaker[AsyncSession],
+    replica_pool: async_sessionmaker[AsyncSession] | None = None,
+) -> MetricsServer | None:
+    if not config.metrics.enabled:
+        return None
+
+    db_engines = {"primary": pool.kw["bind"]}
+    if replica_pool is not None:
+        db_engines["replica"] = replica_pool.kw["bind"]
+    REGISTRY.register(
+        RuntimeCollector(
+            scheduler=scheduler,
+            delivery_queue=delivery_queue,
+            db_engines=db_engines,
+        )
+    )
+    metrics_server = MetricsServer(host=config.metrics.host, port=config.metrics.port)
+    await metrics_server.start()
+    return metrics_server
+
+
 def setup_handlers(dp: Dispatcher) -> None:
     dp.include_router(main_menu.router)
     dp.include_router(reminder_creation.router)
@@ -111,14 +343,57 @@ def setup_handlers(dp: Dispatcher) -> None:
 
 def setup_middlewares(
     dp: Dispatcher,
+    bot: Bot,
     pool: async_sessionmaker[AsyncSession],
     bot_config: Config,
     redis: Redis,
+    replica_pool: async_sessionmaker[AsyncSession] | None = None,
+    upsert_batcher: UserUpsertBatcher | None = None,
 ) -> None:
+    recent_writes = None
+    if replica_pool is not None:
+        recent_writes = RecentWriteTracker(window=bot_config.db.read_your_writes_window)
+    query_instrumentation = setup_query_instrumentation(bot_config, pool, replica_pool)
     dp.update.outer_middleware(ConfigMiddleware(bot_config))
-    dp.update.outer_middleware(DBMiddleware(pool))
+    dp.update.outer_middleware(
+        DBMiddleware(
+            pool,
+            replica_pool=replica_pool,
+            recent_writes=recent_writes,
+            query_instrumentation=query_instrumentation,
+            unit_of_work=bot_config.db.unit_of_work,
+        )
+    )
+    dp.message.middleware(QueryStatsHandlerMiddleware())
+    dp.callback_query.middleware(QueryStatsHandlerMiddleware())
+    bot.session.middleware(ReleaseConnectionRequestMiddleware())
     dp.update.outer_middleware(RedisMiddleware(redis))
-    dp.update.outer_middleware(LoadDataMiddleware())
+    dp.update.outer_middleware(LoadDataMiddleware(upsert_batcher=upsert_batcher))
+
+
+def setup_user_upsert_batcher(
+    config: Config, pool: async_sessionmaker[AsyncSession]
+) -> UserUpsertBatcher | None:
+    if not config.db.user_upsert_batch_delay:
+        return None
+    return UserUpsertBatcher(
+        pool=pool, max_delay=config.db.user_upsert_batch_delay / 1000
+    )
+
+
+def setup_query_instrumentation(
+    config: Config,
+    pool: async_sessionmaker[AsyncSession],
+    replica_pool: async_sessionmaker[AsyncSession] | None = None,
+) -> QueryInstrumentation:
+    query_instrumentation = QueryInstrumentation(
+        slow_query_threshold=config.db.slow_query_threshold / 1000,
+        n_plus_one_threshold=config.db.n_plus_one_threshold,
+    )
+    for session_pool in (pool, replica_pool):
+        if session_pool is not None:
+            query_instrumentation.attach(session_pool.kw["bind"].sync_engine)
+    return query_instrumentation
 
 
 def setup_storage(config: Config) -> Union[MemoryStorage, RedisStorage]:
@@ -1,10 +1,12 @@
 import logging
-from typing import Any, Generic, List, Optional, Sequence, Type, TypeVar
+from typing import Any, ClassVar, Generic, List, Optional, Sequence, Type, TypeVar
 
-from sqlalchemy import delete, func
+from sqlalchemy import delete, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql.base import ExecutableOption
 
+from src.database.dao.load_profiles import LoadProfile
 from src.database.models.base import Base
 
 logger = logging.getLogger(__name__)
@@ -13,16 +15,28 @@ Model = TypeVar("Model", bound=Base)
 
 
 class BaseDAO(Generic[Model]):
+    # Опции загрузки связей по профилям; профиля нет - грузятся только столбцы
+    load_options: ClassVar[dict[LoadProfile, tuple[ExecutableOption, ...]]] = {}
+
     def __init__(self, model: Type[Model], session: AsyncSession):
         self.model = model
         self.session = session
 
-    async def get_by_id(self, id_: Any) -> Optional[Model]:
-        return await self.session.get(self.model, id_)
+    def options_for(self, profile: LoadProfile) -> tuple[ExecutableOption, ...]:
+        return self.load_options.get(profile, ())
+
+    async def get_by_id(
+        self, id_: Any, profile: LoadProfile = LoadProfile.SINGLE
+    ) -> Optional[Model]:
+        return await self.session.get(
+            self.model, id_, options=self.options_for(profile)
+        )
 
-    async def get_all(self, skip: int = 0) -> List[Model]:
+    async def get_all(
+        self, skip: int = 0, profile: LoadProfile = LoadProfile.LIST
+    ) -> List[Model]:
 
-        stmt = select(self.model).offset(skip)
+        stmt = select(self.model).options(*self.options_for(profile)).offset(skip)
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
@@ -32,8 +46,11 @@ class BaseDAO(Generic[Model]):
         await self.refresh(obj)
         return obj
 
-    async def update(self, db_obj: Model, update_data: dict) -> None:
-
+    async def update(
+        self, db_obj: Model, update_data: dict, refresh: bool = False
+    ) -> None:
+        # Серверные значения (updated_at) модели с eager_defaults получают
+        # через RETURNING того же UPDATE; refresh нужен только остальным
         for key, value in update_data.items():
             if hasattr(db_obj, key):
                 setattr(db_obj, key, value)
@@ -43,9 +60,24 @@ class BaseDAO(Generic[Model]):
                 )
         self.session.add(db_obj)
         await self.flush()
-        await self.refresh(db_obj)
+        if refresh:
+            await self.refresh(db_obj)
         return db_obj
 
+    async def update_by_id(self, id_: Any, update_data: dict) -> Optional[Model]:
+        """UPDATE ... RETURNING по первичному ключу без загрузки объекта заранее.
+
+        Обновлённый объект приходит из того же запроса; None - записи нет.
+        """
+        stmt = (
+            update(self.model)
+            .where(self.model.id == id_)
+            .values(**update_data)
+            .returning(self.model)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
     async def delete(self, db_obj: Model) -> None:
         await self.session.delete(db_obj)
 
@@ -1,27 +1,208 @@
-from dataclasses import dataclass, field
+import inspect
+from typing import Any, Callable
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState
 
 from src.database.dao.base import BaseDAO
 from src.database.dao.chat import ChatDAO
 from src.database.dao.reminder import ReminderDAO
 from src.database.dao.user import UserDAO
 from src.database.models.base import Base
+from src.database.routing import RecentWriteTracker
+
+
+class _BoundDAO:
+    """Прокси DAO, через который commit() идёт в HolderDAO.
+
+    Там в unit_of_work он становится flush, а после настоящего COMMIT
+    выполняются колбэки on_commit.
+    """
+
+    def __init__(self, holder: "HolderDAO", dao: BaseDAO):
+        self._holder = holder
+        self._dao = dao
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "commit":
+            return self._holder._commit_step
+        return getattr(self._dao, name)
 
 
-@dataclass
 class HolderDAO:
-    session: AsyncSession
-    base: BaseDAO = field(init=False)
-    user: UserDAO = field(init=False)
-    chat: ChatDAO = field(init=False)
-    reminder: ReminderDAO = field(init=False)
-
-    def __post_init__(self):
-        self.user = UserDAO(self.session)
-        self.chat = ChatDAO(self.session)
-        self.base = BaseDAO(Base, self.session)
-        self.reminder = ReminderDAO(self.session)
+    """Набор DAO поверх сессии, которая открывается при первом обращении к БД.
+
+    Запросы апдейта идут в одной транзакции, пока хендлер не обратится к
+    Bot API: перед запросом к Telegram release_connection фиксирует транзакцию,
+    если она только читала, и соединение не держится на время HTTP-вызова.
+    Транзакция с записью держит соединение до commit/rollback, как и раньше.
+
+    Чисто читающие запросы (списки, статистика) идут через read: при
+    настроенной реплике это DAO поверх неё, кроме случаев, когда user_id
+    недавно что-то записал - тогда чтение остаётся на основной БД.
+
+    В режиме unit_of_work commit() у DAO только сбрасывает изменения в БД,
+    а вся транзакция апдейта фиксируется одним COMMIT в finish() из
+    DBMiddleware. Пока она ничего не записала, release_connection отпускает
+    её перед запросом к Bot API, как и без unit_of_work; транзакция с
+    записью остаётся открытой до finish(). Явный commit() самого HolderDAO
+    по-прежнему фиксирует сразу - для сценариев, которым нужен
+    промежуточный commit.
+
+    Побочные эффекты записи вне БД (задачи планировщика, кэши в Redis)
+    регистрируются через on_commit и выполняются только после успешного
+    COMMIT; при rollback они отбрасываются.
+    """
+
+    def __init__(
+        self,
+        pool: async_sessionmaker[AsyncSession],
+        replica_pool: async_sessionmaker[AsyncSession] | None = None,
+        recent_writes: RecentWriteTracker | None = None,
+        user_id: int | None = None,
+        unit_of_work: bool = False,
+    ):
+        self.pool = pool
+        self.unit_of_work = unit_of_work
+        self.replica_pool = replica_pool
+        self.recent_writes = recent_writes
+        self.user_id = user_id
+        self._session: AsyncSession | None = None
+        self._daos: dict[str, _BoundDAO] = {}
+        self._has_writes = False
+        self._replica: HolderDAO | None = None
+        self._after_commit: list[tuple[Callable[..., Any], tuple]] = []
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self.pool()
+            sync_session = self._session.sync_session
+            event.listen(sync_session, "do_orm_execute", self._on_execute)
+            event.listen(sync_session, "after_flush", self._mark_writes)
+            event.listen(sync_session, "after_commit", self._on_commit)
+            event.listen(sync_session, "after_rollback", self._reset_writes)
+        return self._session
+
+    @property
+    def read(self) -> "HolderDAO":
+        if self.replica_pool is None or self._has_pending_writes():
+            # Незафиксированную запись своей транзакции реплика не увидит
+            return self
+        if (
+            self.recent_writes is not None
+            and self.user_id is not None
+            and self.recent_writes.wrote_recently(self.user_id)
+        ):
+            return self
+        if self._replica is None:
+            self._replica = HolderDAO(self.replica_pool)
+        return self._replica
+
+    @property
+    def base(self) -> BaseDAO:
+        return self._get_dao("base", lambda session: BaseDAO(Base, session))
+
+    @property
+    def user(self) -> UserDAO:
+        return self._get_dao("user", UserDAO)
+
+    @property
+    def chat(self) -> ChatDAO:
+        return self._get_dao("chat", ChatDAO)
+
+    @property
+    def reminder(self) -> ReminderDAO:
+        return self._get_dao("reminder", ReminderDAO)
+
+    def _get_dao(self, name: str, factory) -> Any:
+        if name not in self._daos:
+            self._daos[name] = _BoundDAO(self, factory(self.session))
+        return self._daos[name]
+
+    def on_commit(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Выполнить callback(*args) после ближайшего успешного COMMIT."""
+        self._after_commit.append((callback, args))
 
     async def commit(self):
         await self.session.commit()
+        await self._run_after_commit()
+
+    async def finish(self, failed: bool = False) -> None:
+        """Завершает транзакцию апдейта: один commit или rollback при ошибке."""
+        session = self._session
+        in_transaction = session is not None and session.in_transaction()
+        if failed:
+            self._after_commit.clear()
+            if in_transaction:
+                await session.rollback()
+            return
+        if in_transaction:
+            await session.commit()
+        await self._run_after_commit()
+
+    async def release_connection(self) -> None:
+        """Отдаёт соединение в пул перед внешним вызовом (запросом к Bot API).
+
+        Фиксируется только транзакция, которая только читала. Транзакция с
+        записью остаётся открытой: без unit_of_work её завершит сам сервис,
+        в unit_of_work - finish() в конце апдейта.
+        """
+        if self._replica is not None:
+            await self._replica.release_connection()
+        session = self._session
+        if session is None or not session.in_transaction():
+            return
+        if self._has_pending_writes():
+            return
+        # Транзакция только читала: COMMIT заменяет ROLLBACK при возврате
+        # соединения и, в отличие от rollback, не экспирирует загруженные
+        # объекты. Колбэки on_commit ждут COMMIT, который зафиксирует запись.
+        await session.commit()
+
+    def _has_pending_writes(self) -> bool:
+        session = self._session
+        return session is not None and bool(
+            self._has_writes or session.new or session.dirty or session.deleted
+        )
+
+    async def _commit_step(self) -> None:
+        # commit() у DAO: в unit_of_work транзакцию фиксирует finish()
+        if self.unit_of_work:
+            await self.session.flush()
+        else:
+            await self.commit()
+
+    async def _run_after_commit(self) -> None:
+        callbacks, self._after_commit = self._after_commit, []
+        for callback, args in callbacks:
+            result = callback(*args)
+            if inspect.isawaitable(result):
+                await result
+
+    async def close(self) -> None:
+        if self._replica is not None:
+            await self._replica.close()
+        if self._session is not None:
+            await self._session.close()
+
+    def _on_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        if not orm_execute_state.is_select:
+            self._has_writes = True
+
+    def _mark_writes(self, session, flush_context) -> None:
+        self._has_writes = True
+
+    def _on_commit(self, session) -> None:
+        if (
+            self._has_writes
+            and self.recent_writes is not None
+            and self.user_id is not None
+        ):
+            self.recent_writes.mark(self.user_id)
+        self._has_writes = False
+
+    def _reset_writes(self, session) -> None:
+        self._has_writes = False
+        self._after_commit.clear()
@@ -0,0 +1,17 @@
+import enum
+
+
+class LoadProfile(enum.Enum):
+    """Сценарий выборки, по которому DAO решает, какие связи подгружать.
+
+    Сами связи в моделях ничего не грузят заранее: всё, что нужно сверх
+    столбцов модели, DAO добавляет опциями запроса для своего профиля.
+    """
+
+    # Списки у пользователя: только столбцы самой модели
+    LIST = "list"
+    # Одна запись по id; связи - только те, что DAO считает частью карточки
+    # (пользователь грузит свои напоминания, напоминанию владелец не нужен)
+    SINGLE = "single"
+    # Админские выборки по многим пользователям
+    ADMIN = "admin"
@@ -1,14 +1,36 @@
 import datetime
 
-from sqlalchemy import select
+from sqlalchemy import (
+    DateTime,
+    delete,
+    Integer,
+    Row,
+    cast,
+    column,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from src.database.dao.base import BaseDAO
+from src.database.dao.load_profiles import LoadProfile
 from src.database.models.reminder import Reminder
+from src.database.models.user import User
+from src.dto.reminder import ReminderPageKey, ReminderPayloadDTO
 from src.enums.reminder import FrequencyType
 
 
 class ReminderDAO(BaseDAO[Reminder]):
+    load_options = {
+        # В админских выборках напоминания разных пользователей показываются
+        # вместе с владельцем
+        LoadProfile.ADMIN: (joinedload(Reminder.user),),
+    }
+
     def __init__(self, session: AsyncSession):
         super().__init__(Reminder, session)
 
@@ -38,32 +60,173 @@ class ReminderDAO(BaseDAO[Reminder]):
         all_reminders = await self.get_all()
         return all_reminders
 
-    async def get_active_user_reminders(self, user_id: int):
+    async def get_active_user_reminders(
+        self,
+        user_id: int,
+        after: ReminderPageKey | None = None,
+        limit: int | None = None,
+        profile: LoadProfile = LoadProfile.LIST,
+        before: ReminderPageKey | None = None,
+    ):
+        return await self._get_user_reminders(
+            user_id, after, before, limit, profile, Reminder.is_active == True
+        )
+
+    async def get_disabled_user_reminders(
+        self,
+        user_id: int,
+        after: ReminderPageKey | None = None,
+        limit: int | None = None,
+        profile: LoadProfile = LoadProfile.LIST,
+        before: ReminderPageKey | None = None,
+    ):
+        return await self._get_user_reminders(
+            user_id, after, before, limit, profile, Reminder.is_active == False
+        )
+
+    async def get_all_user_reminders(
+        self,
+        user_id: int,
+        after: ReminderPageKey | None = None,
+        limit: int | None = None,
+        profile: LoadProfile = LoadProfile.LIST,
+        before: ReminderPageKey | None = None,
+    ):
+        return await self._get_user_reminders(user_id, after, before, limit, profile)
+
+    async def _get_user_reminders(
+        self,
+        user_id: int,
+        after: ReminderPageKey | None,
+        before: ReminderPageKey | None,
+        limit: int | None,
+        profile: LoadProfile,
+        *criteria,
+    ):
+        """Напоминания пользователя по (start_datetime, id), страницами по ключу.
+
+        after - ключ последнего напоминания предыдущей страницы: выборка
+        продолжается строго после него по индексу, без OFFSET, поэтому
+        любая страница стоит одинаково. before - ключ первого напоминания
+        следующей страницы, для шага назад: индекс читается в обратную
+        сторону, результат возвращается в прямом порядке. Без limit
+        возвращается всё.
+        """
+        page_key = tuple_(Reminder.start_datetime, Reminder.id)
         stmt = (
             select(Reminder)
-            .where(Reminder.user_id == user_id, Reminder.is_active == True)
-            .order_by(Reminder.start_datetime.asc())
+            .options(*self.options_for(profile))
+            .where(Reminder.user_id == user_id, *criteria)
         )
+        if before is not None:
+            stmt = stmt.where(page_key < tuple_(*before)).order_by(
+                Reminder.start_datetime.desc(), Reminder.id.desc()
+            )
+        else:
+            stmt = stmt.order_by(Reminder.start_datetime.asc(), Reminder.id.asc())
+        if after is not None:
+            stmt = stmt.where(page_key > tuple_(*after))
+        if limit is not None:
+            stmt = stmt.limit(limit)
         result = await self.session.execute(stmt)
         reminders = result.scalars().all()
+        if before is not None:
+            reminders = reminders[::-1]
         return reminders
 
-    async def get_disabled_user_reminders(self, user_id: int):
+    async def set_user_reminders_active(
+        self, user_id: int, is_active: bool
+    ) -> list[Row[tuple[int, str | None]]]:
+        """Один UPDATE на все напоминания пользователя, возвращает (id, job_id)."""
         stmt = (
-            select(Reminder)
-            .where(Reminder.user_id == user_id, Reminder.is_active == False)
-            .order_by(Reminder.start_datetime.asc())  #
+            update(Reminder)
+            .where(Reminder.user_id == user_id)
+            .values(is_active=is_active)
+            .returning(Reminder.id, Reminder.apscheduler_job_id)
         )
         result = await self.session.execute(stmt)
-        reminders = result.scalars().all()
-        return reminders
+        return result.all()
 
-    async def get_all_user_reminders(self, user_id: int):
+    async def delete_user_reminders(
+        self, user_id: int, is_active: bool | None = None
+    ) -> list[Row[tuple[int, str | None]]]:
+        """Один DELETE без загрузки объектов, возвращает (id, job_id) удалённых.
+
+        is_active ограничивает удаление активными или отключёнными.
+        """
         stmt = (
-            select(Reminder)
+            delete(Reminder)
             .where(Reminder.user_id == user_id)
-            .order_by(Reminder.start_datetime.asc())
+            .returning(Reminder.id, Reminder.apscheduler_job_id)
         )
+        if is_active is not None:
+            stmt = stmt.where(Reminder.is_active == is_active)
         result = await self.session.execute(stmt)
-        reminders = result.scalars().all()
-        return reminders
+        return result.all()
+
+    async def get_payload(self, reminder_id: int) -> ReminderPayloadDTO | None:
+        stmt = (
+            select(Reminder.id, User.tg_id, Reminder.text, Reminder.is_active)
+            .join(User, Reminder.user_id == User.id)
+            .where(Reminder.id == reminder_id)
+        )
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return ReminderPayloadDTO(
+            reminder_id=row.id,
+            tg_user_id=row.tg_id,
+            text=row.text,
+            is_active=row.is_active,
+        )
+
+    async def claim_due_reminders(
+        self, now: datetime.datetime, limit: int
+    ) -> list[Row[tuple[Reminder, int]]]:
+        # Строки остаются заблокированными до конца транзакции,
+        # параллельные воркеры пропускают их благодаря SKIP LOCKED
+        stmt = (
+            select(Reminder, User.tg_id)
+            .join(User, Reminder.user_id == User.id)
+            .where(Reminder.is_active == True, Reminder.next_run_time <= now)
+            .order_by(Reminder.next_run_time.asc())
+            .limit(limit)
+            .with_for_update(of=Reminder, skip_locked=True)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def update_next_run_times(
+        self,
+        next_run_times: dict[int, datetime.datetime | None],
+        only_forward: bool = False,
+    ) -> None:
+        """Один UPDATE ... FROM (VALUES ...) на всю пачку.
+
+        only_forward не даёт отложенной записи затереть более позднее время,
+        уже записанное другим путём.
+        """
+        if not next_run_times:
+            return
+        new_values = values(
+            column("id", Integer),
+            column("next_run_time", DateTime(timezone=True)),
+            name="new_values",
+        ).data(list(next_run_times.items()))
+        # Столбец из одних NULL Postgres типизирует как text
+        next_run_time = cast(new_values.c.next_run_time, DateTime(timezone=True))
+        stmt = (
+            update(Reminder)
+            .where(Reminder.id == new_values.c.id)
+            .values(next_run_time=next_run_time)
+            .execution_options(synchronize_session=False)
+        )
+        if only_forward:
+            stmt = stmt.where(
+                or_(
+                    Reminder.next_run_time.is_(None),
+                    Reminder.next_run_time < next_run_time,
+                )
+            )
+        await self.session.execute(stmt)
@@ -4,18 +4,30 @@ from sqlalchemy import and_, func
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 
 from src import dto
 from src.database.dao.base import BaseDAO
+from src.database.dao.load_profiles import LoadProfile
 from src.database.models.user import User
 
 
 class UserDAO(BaseDAO[User]):
+    load_options = {
+        # Карточка одного пользователя вместе с его напоминаниями; в списках
+        # пользователей напоминания не нужны
+        LoadProfile.SINGLE: (selectinload(User.reminders),),
+    }
+
     def __init__(self, session: AsyncSession):
         super().__init__(User, session)
 
-    async def get_by_tg_id(self, tg_id: int) -> User:
-        result = await self.session.execute(select(User).where(User.tg_id == tg_id))
+    async def get_by_tg_id(
+        self, tg_id: int, profile: LoadProfile = LoadProfile.LIST
+    ) -> User:
+        result = await self.session.execute(
+            select(User).options(*self.options_for(profile)).where(User.tg_id == tg_id)
+        )
         return result.scalar_one()
 
     async def get_for_seven_days(self) -> list[User]:
@@ -53,3 +65,40 @@ class UserDAO(BaseDAO[User]):
             .returning(User)
         )
         return saved_user.scalar_one().to_dto()
+
+    async def upsert_users(self, users: list[dto.User]) -> list[dto.User]:
+        """Один INSERT ... ON CONFLICT DO UPDATE на всю пачку.
+
+        tg_id в пачке должны быть уникальны: одну строку Postgres не даёт
+        обновить дважды в одном запросе.
+        """
+        if not users:
+            return []
+        stmt = insert(User).values(
+            [
+                dict(
+                    tg_id=user.tg_id,
+                    first_name=user.first_name,
+                    last_name=user.last_name,
+                    username=user.username,
+                    is_bot=user.is_bot,
+                    language_code=user.language_code,
+                )
+                for user in users
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=(User.tg_id,),
+            set_={
+                column: stmt.excluded[column]
+                for column in (
+                    "first_name",
+                    "last_name",
+                    "username",
+                    "is_bot",
+                    "language_code",
+                )
+            },
+        ).returning(User)
+        saved_users = await self.session.scalars(stmt)
+        return [saved_user.to_dto() for saved_user in saved_users]
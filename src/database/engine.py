@@ -1,12 +1,69 @@
+import dataclasses
+import time
+import uuid
+
 from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config.main_config import DbConfig
+from src.services.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который замеряет ожидание свободного соединения и таймауты."""
+
+    def _do_get(self):
+        pool_name = self._orig_logging_name or "primary"
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(pool=pool_name).inc()
+            raise
+        finally:
+            DB_POOL_WAIT.labels(pool=pool_name).observe(
+                time.perf_counter() - started_at
+            )
+
+
+def _build_connect_args(db_config: DbConfig) -> dict:
+    if db_config.pgbouncer:
+        # Prepared statements не переживают смену серверного соединения,
+        # а параметры сессии при подключении PgBouncer отклоняет
+        connect_args = {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+        if db_config.statement_timeout:
+            connect_args["command_timeout"] = db_config.statement_timeout / 1000
+        return connect_args
 
+    connect_args = {"prepared_statement_cache_size": db_config.statement_cache_size}
+    if db_config.statement_timeout:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(db_config.statement_timeout)
+        }
+    return connect_args
 
-def create_pool(db_config: DbConfig) -> async_sessionmaker[AsyncSession]:
 
-    engine = create_async_engine(url=make_url(db_config.create_uri()))
+def create_pool(
+    db_config: DbConfig, name: str = "primary"
+) -> async_sessionmaker[AsyncSession]:
+
+    engine = create_async_engine(
+        url=make_url(db_config.create_uri()),
+        poolclass=InstrumentedQueuePool,
+        pool_size=db_config.pool_size,
+        max_overflow=db_config.max_overflow,
+        pool_timeout=db_config.pool_timeout,
+        pool_recycle=db_config.pool_recycle,
+        pool_pre_ping=db_config.pool_pre_ping,
+        pool_logging_name=name,
+        connect_args=_build_connect_args(db_config),
+    )
     pool: async_sessionmaker[AsyncSession] = async_sessionmaker(
         bind=engine,
         class_=AsyncSession,
@@ -16,3 +73,17 @@ def create_pool(db_config: DbConfig) -> async_sessionmaker[AsyncSession]:
     )
 
     return pool
+
+
+def create_replica_pool(
+    db_config: DbConfig,
+) -> async_sessionmaker[AsyncSession] | None:
+    if not db_config.replica_host:
+        return None
+
+    replica_config = dataclasses.replace(
+        db_config,
+        host=db_config.replica_host,
+        port=db_config.replica_port or db_config.port,
+    )
+    return create_pool(replica_config, name="replica")
@@ -0,0 +1,135 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.services.metrics import (
+    DB_REPEATED_STATEMENTS,
+    DB_STATEMENTS_PER_UPDATE,
+    DB_TIME_PER_UPDATE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Запросы к БД, выполненные при обработке одного апдейта."""
+
+    handler: Optional[str] = None
+    statements: int = 0
+    duration: float = 0.0
+    by_statement: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.duration += duration
+        self.by_statement[statement] += 1
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def parameters_shape(parameters: Any) -> str:
+    """Типы параметров без значений: в логах не должно быть текстов пользователей."""
+    if isinstance(parameters, dict):
+        return (
+            "{"
+            + ", ".join(
+                f"{key}: {type(value).__name__}" for key, value in parameters.items()
+            )
+            + "}"
+        )
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: набор строк одинаковой формы
+            return f"{len(parameters)} x {parameters_shape(parameters[0])}"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+class QueryInstrumentation:
+    """Счётчик запросов и времени БД на апдейт, лог медленных запросов и N+1.
+
+    Хуки вешаются на движок, а статистика копится в QueryStats текущего
+    апдейта (track_queries в DBMiddleware); запросы вне апдейтов - задачи
+    планировщика, диспетчер - попадают только в лог медленных.
+    """
+
+    def __init__(
+        self, slow_query_threshold: float = 0.2, n_plus_one_threshold: int = 5
+    ):
+        self.slow_query_threshold = slow_query_threshold
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def report(self, stats: QueryStats) -> None:
+        if not stats.statements:
+            return
+        handler = stats.handler or "unknown"
+        DB_STATEMENTS_PER_UPDATE.labels(handler=handler).observe(stats.statements)
+        DB_TIME_PER_UPDATE.labels(handler=handler).observe(stats.duration)
+        logger.debug(
+            f"Handler {handler}: {stats.statements} statements, "
+            f"{stats.duration * 1000:.1f} ms in DB"
+        )
+        if not self.n_plus_one_threshold:
+            return
+        for statement, count in stats.by_statement.items():
+            if count >= self.n_plus_one_threshold:
+                DB_REPEATED_STATEMENTS.labels(handler=handler).inc()
+                logger.warning(
+                    f"Possible N+1 in handler {handler}: statement executed "
+                    f"{count} times: {statement}"
+                )
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        duration = time.perf_counter() - conn.info["query_started_at"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        if self.slow_query_threshold and duration >= self.slow_query_threshold:
+            handler = stats.handler if stats is not None else None
+            logger.warning(
+                f"Slow query ({duration * 1000:.1f} ms, handler {handler}): "
+                f"{statement} parameters {parameters_shape(parameters)}"
+            )
+
+    def _handle_error(self, exception_context) -> None:
+        # after_cursor_execute после ошибки не вызывается
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
@@ -0,0 +1,5 @@
+# Все модели регистрируются вместе: опции загрузки связей в DAO настраивают
+# мапперы, и строковые ссылки в relationship() должны уже разрешаться
+from .chat import Chat
+from .reminder import Reminder
+from .user import User
@@ -4,7 +4,7 @@ import datetime
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Dict
 
-from sqlalchemy import JSON, Boolean, DateTime, Enum, ForeignKey, String, func
+from sqlalchemy import JSON, Boolean, DateTime, Enum, ForeignKey, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database.models.base import Base
@@ -17,12 +17,26 @@ if TYPE_CHECKING:
 class Reminder(Base):
     __tablename__ = "reminders"
     __mapper_args__ = {"eager_defaults": True}
+    # Страницы списков напоминаний пользователя - диапазоны по этим индексам
+    __table_args__ = (
+        Index(
+            "ix__reminders_user_id_is_active_start_datetime_id",
+            "user_id",
+            "is_active",
+            "start_datetime",
+            "id",
+        ),
+        Index(
+            "ix__reminders_user_id_start_datetime_id", "user_id", "start_datetime", "id"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey(column="users.id", ondelete="CASCADE")
     )
-    user: Mapped["User"] = relationship(back_populates="reminders", lazy="joined")
+    # Связи грузятся только опциями профиля в DAO (см. LoadProfile)
+    user: Mapped["User"] = relationship(back_populates="reminders", lazy="raise")
     text: Mapped[str] = mapped_column(String(255), nullable=False)
     is_active: Mapped[bool] = mapped_column(
         Boolean, default=True, nullable=False, index=True
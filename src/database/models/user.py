@@ -22,7 +22,9 @@ class User(Base):
     language_code: Mapped[str | None] = mapped_column(default=None)
     reminders: Mapped[list["Reminder"] | None] = relationship(
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
+        # Напоминания удаляет ON DELETE CASCADE, загружать их для этого не нужно
+        passive_deletes=True,
     )
 
     def to_dto(self) -> dto.User:
@@ -0,0 +1,28 @@
+import time
+
+
+class RecentWriteTracker:
+    """Помнит пользователей, недавно изменявших данные, для read-your-writes.
+
+    Пока с последней записи пользователя не прошло window секунд, его
+    чтения идут в основную БД: реплика могла ещё не догнать изменения.
+    """
+
+    def __init__(self, window: float = 5.0, max_size: int = 100_000):
+        self.window = window
+        self.max_size = max_size
+        self._written_at: dict[int, float] = {}
+
+    def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        self._written_at[user_id] = now
+        if len(self._written_at) > self.max_size:
+            self._written_at = {
+                key: written_at
+                for key, written_at in self._written_at.items()
+                if now - written_at < self.window
+            }
+
+    def wrote_recently(self, user_id: int) -> bool:
+        written_at = self._written_at.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < self.window
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, NamedTuple
 
 from sqlalchemy import Enum
 
@@ -49,3 +49,42 @@ class GetReminderToShowDTO:
             is_active=reminder.is_active,
             next_run_time=reminder.next_run_time,
         )
+
+
+@dataclass(frozen=True)
+class ReminderPayloadDTO:
+    reminder_id: int
+    tg_user_id: int
+    text: str
+    is_active: bool
+
+
+class ReminderPageKey(NamedTuple):
+    """Ключ keyset-пагинации: последнее напоминание предыдущей страницы."""
+
+    start_datetime: datetime
+    reminder_id: int
+
+    @classmethod
+    def from_reminder(cls, reminder: Reminder) -> "ReminderPageKey":
+        return cls(reminder.start_datetime, reminder.id)
+
+    def encode(self) -> str:
+        # Целые микросекунды: ключ должен совпасть с БД точно, float округлит
+        micros = (self.start_datetime - _EPOCH) // timedelta(microseconds=1)
+        return f"{micros}:{self.reminder_id}"
+
+    @classmethod
+    def decode(cls, value: str) -> "ReminderPageKey":
+        micros, reminder_id = value.split(":")
+        return cls(_EPOCH + timedelta(microseconds=int(micros)), int(reminder_id))
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class ReminderPage:
+    reminders: list[Reminder]
+    has_prev: bool
+    has_next: bool
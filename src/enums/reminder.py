@@ -8,3 +8,9 @@ class FrequencyType(enum.Enum):
     MONTHLY = "ежемесячно"
     YEARLY = "ежегодно"
     OTHER = "другое"
+
+
+class ReminderListFilter(enum.Enum):
+    ALL = "all"
+    ACTIVE = "active"
+    DISABLED = "disabled"
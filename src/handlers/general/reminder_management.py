@@ -30,6 +30,9 @@ async def disable_reminder(
     reminder = await reminder_service.disable_reminder(
         dao=dao, reminder_id=reminder_id, scheduler_service=scheduler_service
     )
+    if reminder is None:
+        await callback.answer("Напоминание не найдено")
+        return
     formatted_reminder_text = get_formatted_reminder_text(reminder)
     updated_reminder_status = reminder.is_active
     await callback.answer("Напоминание отключено")
@@ -52,6 +55,9 @@ async def enable_reminder(
     reminder = await reminder_service.enable_reminder(
         dao=dao, reminder_id=reminder_id, scheduler_service=scheduler_service
     )
+    if reminder is None:
+        await callback.answer("Напоминание не найдено")
+        return
     formatted_reminder_text = get_formatted_reminder_text(reminder)
     updated_reminder_status = reminder.is_active
     await callback.answer("Напоминание включено")
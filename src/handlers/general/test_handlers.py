@@ -4,6 +4,7 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
 from src.database.dao.holder import HolderDAO
+from src.database.dao.load_profiles import LoadProfile
 from src.states.general import CheckStates
 
 router: Router = Router()
@@ -14,7 +15,7 @@ async def get_all_users(
     message: Message,
     dao: HolderDAO,
 ):
-    all_users = await dao.user.get_all()
+    all_users = await dao.read.user.get_all(profile=LoadProfile.ADMIN)
     await message.answer(text=f"User:{all_users}")
 
 
@@ -1,15 +1,18 @@
-import asyncio
-
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
 
 from src.database.dao.holder import HolderDAO
+from src.dto.reminder import ReminderPageKey
 from src.dto.user import User
+from src.enums.reminder import ReminderListFilter
 from src.keyboards.reminder_management import ReminderManagementKeyboards
 from src.keyboards.view_created_reminders import ViewCreatedRemindersKeyboards
 from src.services.reminder import ReminderService
 from src.services.scheduler import SchedulerService
-from src.text.formatters.reminder_management import get_formatted_reminder_text
+from src.text.formatters.reminder_management import (
+    format_reminders_page,
+    get_formatted_reminder_text,
+)
 
 router: Router = Router()
 
@@ -22,38 +25,89 @@ async def show_created_reminders(callback: CallbackQuery):
     )
 
 
-@router.callback_query(F.data == "show_all_reminders_list")
-async def show_all_reminders_list(
+REMINDERS_PAGE_SIZE = 10
+
+REMINDER_LIST_TITLES = {
+    ReminderListFilter.ALL: "Все созданные напоминания",
+    ReminderListFilter.ACTIVE: "Активные напоминания",
+    ReminderListFilter.DISABLED: "Неактивные напоминания",
+}
+
+EMPTY_REMINDER_LIST_TEXTS = {
+    ReminderListFilter.ALL: "У вас нет созданных напоминаний",
+    ReminderListFilter.ACTIVE: "У вас нет активных напоминаний",
+    ReminderListFilter.DISABLED: "У вас нет неактивных напоминаний",
+}
+
+
+async def show_reminders_page(
     callback: CallbackQuery,
     user: User,
     reminder_service: ReminderService,
     dao: HolderDAO,
+    list_filter: ReminderListFilter,
+    after: ReminderPageKey | None = None,
+    before: ReminderPageKey | None = None,
 ):
-    all_reminders = await reminder_service.get_all_user_reminders(
-        dao=dao, user_id=user.db_id
-    )
-    if all_reminders:
-        for reminder in all_reminders:
-            reminder_to_show = get_formatted_reminder_text(reminder)
-            keyboard = (
-                ReminderManagementKeyboards.get_reminder_management_keyboard_by_status(
-                    reminder.id, reminder.is_active
-                )
-            )
-            await callback.message.answer(
-                text=reminder_to_show,
-                reply_markup=keyboard,
-            )
-            await asyncio.sleep(0.05)
+    page_cache = reminder_service.page_cache
+    if after is not None:
+        cursor = f"next:{after.encode()}"
+    elif before is not None:
+        cursor = f"prev:{before.encode()}"
     else:
+        cursor = "first"
+    if page_cache is not None:
+        # Версию читаем до запроса: изменение во время отрисовки её сменит
+        version, cached = await page_cache.get(user.db_id, list_filter, cursor)
+        if cached is not None:
+            text, reply_markup = cached
+            await callback.message.edit_text(text=text, reply_markup=reply_markup)
+            return
+    page = await reminder_service.get_user_reminders_page(
+        dao=dao,
+        user_id=user.db_id,
+        list_filter=list_filter,
+        page_size=REMINDERS_PAGE_SIZE,
+        after=after,
+        before=before,
+    )
+    if page is not None and not page.reminders and (after or before):
+        # Напоминания за ключом успели удалить - показываем список с начала
+        return await show_reminders_page(
+            callback, user, reminder_service, dao, list_filter
+        )
+    if not page or not page.reminders:
         await callback.message.edit_text(
-            text="У вас нет созданных напоминаний",
+            text=EMPTY_REMINDER_LIST_TEXTS[list_filter],
             reply_markup=ViewCreatedRemindersKeyboards.show_created_reminders,
         )
         return
-    await callback.message.answer(
-        text="Выберите нужное действие",
-        reply_markup=ViewCreatedRemindersKeyboards.show_all_reminders_management,
+    text = format_reminders_page(REMINDER_LIST_TITLES[list_filter], page.reminders)
+    reply_markup = ViewCreatedRemindersKeyboards.get_reminders_page_keyboard(
+        page, list_filter
+    )
+    await callback.message.edit_text(text=text, reply_markup=reply_markup)
+    if page_cache is not None:
+        await page_cache.put(
+            user.db_id,
+            version,
+            list_filter,
+            cursor,
+            text,
+            reply_markup,
+            page.reminders,
+        )
+
+
+@router.callback_query(F.data == "show_all_reminders_list")
+async def show_all_reminders_list(
+    callback: CallbackQuery,
+    user: User,
+    reminder_service: ReminderService,
+    dao: HolderDAO,
+):
+    await show_reminders_page(
+        callback, user, reminder_service, dao, ReminderListFilter.ALL
     )
 
 
@@ -64,27 +118,9 @@ async def show_active_reminders_list(
     reminder_service: ReminderService,
     dao: HolderDAO,
 ):
-    all_reminders = await reminder_service.get_active_user_reminders(
-        dao=dao, user_id=user.db_id
+    await show_reminders_page(
+        callback, user, reminder_service, dao, ReminderListFilter.ACTIVE
     )
-    if all_reminders:
-        for reminder in all_reminders:
-            reminder_to_show = get_formatted_reminder_text(reminder)
-            keyboard = (
-                ReminderManagementKeyboards.get_reminder_management_keyboard_by_status(
-                    reminder.id, reminder.is_active
-                )
-            )
-            await callback.message.answer(
-                text=reminder_to_show,
-                reply_markup=keyboard,
-            )
-            await asyncio.sleep(0.05)
-    else:
-        await callback.message.edit_text(
-            text="У вас нет активных напоминаний",
-            reply_markup=ViewCreatedRemindersKeyboards.show_created_reminders,
-        )
 
 
 @router.callback_query(F.data == "show_disabled_reminders_list")
@@ -94,33 +130,48 @@ async def show_disabled_reminders_list(
     reminder_service: ReminderService,
     dao: HolderDAO,
 ):
-    all_reminders = await reminder_service.get_disabled_user_reminders(
-        dao=dao, user_id=user.db_id
+    await show_reminders_page(
+        callback, user, reminder_service, dao, ReminderListFilter.DISABLED
     )
-    if all_reminders:
-        for reminder in all_reminders:
-
-            reminder_to_show = get_formatted_reminder_text(reminder)
-
-            keyboard = (
-                ReminderManagementKeyboards.get_reminder_management_keyboard_by_status(
-                    reminder.id, reminder.is_active
-                )
-            )
-            await callback.message.answer(
-                text=reminder_to_show,
-                reply_markup=keyboard,
-            )
-            await asyncio.sleep(0.05)
-    else:
-        await callback.message.edit_text(
-            text="У вас нет неактивных напоминаний",
-            reply_markup=ViewCreatedRemindersKeyboards.show_created_reminders,
-        )
 
-    await callback.message.answer(
-        text="Выберите нужное действие",
-        reply_markup=ViewCreatedRemindersKeyboards.show_disabled_reminders_management,
+
+@router.callback_query(F.data.startswith("reminders_page:"))
+async def switch_reminders_page(
+    callback: CallbackQuery,
+    user: User,
+    reminder_service: ReminderService,
+    dao: HolderDAO,
+):
+    _, list_filter, direction, page_key = callback.data.split(":", 3)
+    page_key = ReminderPageKey.decode(page_key)
+    await show_reminders_page(
+        callback,
+        user,
+        reminder_service,
+        dao,
+        ReminderListFilter(list_filter),
+        after=page_key if direction == "next" else None,
+        before=page_key if direction == "prev" else None,
+    )
+
+
+@router.callback_query(F.data.startswith("show_reminder:"))
+async def show_reminder(
+    callback: CallbackQuery,
+    user: User,
+    reminder_service: ReminderService,
+    dao: HolderDAO,
+):
+    reminder_id = int(callback.data.split(":")[1])
+    reminder = await reminder_service.get_user_reminder(dao, reminder_id)
+    if reminder is None or reminder.user_id != user.db_id:
+        await callback.answer("Напоминание не найдено")
+        return
+    await callback.message.edit_text(
+        text=get_formatted_reminder_text(reminder),
+        reply_markup=ReminderManagementKeyboards.get_reminder_management_keyboard_by_status(
+            reminder.id, reminder.is_active
+        ),
     )
 
 
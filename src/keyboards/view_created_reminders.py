@@ -1,5 +1,10 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from src.dto.reminder import ReminderPage, ReminderPageKey
+from src.enums.reminder import ReminderListFilter
+
+REMINDER_BUTTON_TEXT_LIMIT = 40
+
 
 class ViewCreatedRemindersButtons:
 
@@ -92,3 +97,49 @@ class ViewCreatedRemindersKeyboards:
             [ViewCreatedRemindersButtons.to_main_menu],
         ],
     )
+
+    @staticmethod
+    def get_reminders_page_keyboard(
+        page: ReminderPage, list_filter: ReminderListFilter
+    ) -> InlineKeyboardMarkup:
+        rows = []
+        for number, reminder in enumerate(page.reminders, start=1):
+            text = reminder.text
+            if len(text) > REMINDER_BUTTON_TEXT_LIMIT:
+                text = text[: REMINDER_BUTTON_TEXT_LIMIT - 1] + "…"
+            rows.append(
+                [
+                    InlineKeyboardButton(
+                        text=f"{number}. {text}",
+                        callback_data=f"show_reminder:{reminder.id}",
+                    )
+                ]
+            )
+
+        navigation = []
+        if page.has_prev:
+            first_key = ReminderPageKey.from_reminder(page.reminders[0])
+            navigation.append(
+                InlineKeyboardButton(
+                    text="◀️ Назад",
+                    callback_data=f"reminders_page:{list_filter.value}:prev:{first_key.encode()}",
+                )
+            )
+        if page.has_next:
+            last_key = ReminderPageKey.from_reminder(page.reminders[-1])
+            navigation.append(
+                InlineKeyboardButton(
+                    text="Вперёд ▶️",
+                    callback_data=f"reminders_page:{list_filter.value}:next:{last_key.encode()}",
+                )
+            )
+        if navigation:
+            rows.append(navigation)
+
+        management = {
+            ReminderListFilter.ALL: ViewCreatedRemindersKeyboards.show_all_reminders_management,
+            ReminderListFilter.ACTIVE: ViewCreatedRemindersKeyboards.show_active_reminders_management,
+            ReminderListFilter.DISABLED: ViewCreatedRemindersKeyboards.show_disabled_reminders_management,
+        }[list_filter]
+        rows.extend(management.inline_keyboard)
+        return InlineKeyboardMarkup(inline_keyboard=rows)
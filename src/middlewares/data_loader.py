@@ -7,10 +7,19 @@ from src import dto
 from src.database.dao.holder import HolderDAO
 
 # from app.services.chat import upsert_chat
-from src.services.user import upsert_user
+from src.services.user import get_or_upsert_user
+from src.services.user_cache import UserIdentityCache
+from src.services.user_upsert_batcher import UserUpsertBatcher
 
 
 class LoadDataMiddleware(BaseMiddleware):
+    def __init__(
+        self,
+        user_cache: UserIdentityCache | None = None,
+        upsert_batcher: UserUpsertBatcher | None = None,
+    ):
+        self.user_cache = user_cache or UserIdentityCache()
+        self.upsert_batcher = upsert_batcher
 
     async def __call__(
         self,
@@ -19,14 +28,24 @@ class LoadDataMiddleware(BaseMiddleware):
         data: dict[str, Any],
     ) -> Any:
         holder_dao = data["dao"]
-        data["user"] = await save_user(data, holder_dao)
+        data["user"] = await save_user(
+            data, holder_dao, self.user_cache, self.upsert_batcher
+        )
         result = await handler(event, data)
         return result
 
 
-async def save_user(data: dict[str, Any], holder_dao: HolderDAO) -> dto.User:
-    return await upsert_user(
-        dto.User.from_aiogram(data["event_from_user"]), holder_dao.user
+async def save_user(
+    data: dict[str, Any],
+    holder_dao: HolderDAO,
+    user_cache: UserIdentityCache,
+    upsert_batcher: UserUpsertBatcher | None = None,
+) -> dto.User:
+    return await get_or_upsert_user(
+        dto.User.from_aiogram(data["event_from_user"]),
+        holder_dao.user,
+        user_cache,
+        upsert_batcher,
     )
 
 
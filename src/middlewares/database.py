@@ -1,15 +1,45 @@
-from typing import Any, Awaitable, Callable
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 
 from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
 from aiogram.types import TelegramObject
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.database.dao.holder import HolderDAO
+from src.database.instrumentation import (
+    QueryInstrumentation,
+    current_query_stats,
+    track_queries,
+)
+from src.database.routing import RecentWriteTracker
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+# HolderDAO апдейта, который сейчас обрабатывается в этой задаче
+_current_dao: ContextVar[Optional[HolderDAO]] = ContextVar("current_dao", default=None)
 
 
 class DBMiddleware(BaseMiddleware):
-    def __init__(self, pool: async_sessionmaker[AsyncSession]):
+    def __init__(
+        self,
+        pool: async_sessionmaker[AsyncSession],
+        replica_pool: async_sessionmaker[AsyncSession] | None = None,
+        recent_writes: RecentWriteTracker | None = None,
+        query_instrumentation: QueryInstrumentation | None = None,
+        unit_of_work: bool = False,
+    ):
         self.pool = pool
+        self.replica_pool = replica_pool
+        self.recent_writes = recent_writes
+        self.query_instrumentation = query_instrumentation
+        self.unit_of_work = unit_of_work
 
     async def __call__(
         self,
@@ -17,9 +47,71 @@ class DBMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        async with self.pool() as session:
-            holder_dao = HolderDAO(session)
-            data["dao"] = holder_dao
-            result = await handler(event, data)
-            del data["dao"]
-            return result
+        # Сессия и соединение берутся только при первом обращении к БД
+        event_from_user = data.get("event_from_user")
+        holder_dao = HolderDAO(
+            self.pool,
+            replica_pool=self.replica_pool,
+            recent_writes=self.recent_writes,
+            user_id=event_from_user.id if event_from_user else None,
+            unit_of_work=self.unit_of_work,
+        )
+        data["dao"] = holder_dao
+        dao_token = _current_dao.set(holder_dao)
+        with track_queries() as query_stats:
+            try:
+                result = await handler(event, data)
+            except Exception:
+                if self.unit_of_work:
+                    await holder_dao.finish(failed=True)
+                raise
+            else:
+                if self.unit_of_work:
+                    await holder_dao.finish()
+                return result
+            finally:
+                _current_dao.reset(dao_token)
+                del data["dao"]
+                await holder_dao.close()
+                if self.query_instrumentation is not None:
+                    self.query_instrumentation.report(query_stats)
+
+
+class QueryStatsHandlerMiddleware(BaseMiddleware):
+    """Подписывает статистику запросов апдейта именем выбранного хендлера.
+
+    Хендлер известен только внутренним middleware, DBMiddleware внешний.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        query_stats = current_query_stats()
+        handler_object = data.get("handler")
+        if query_stats is not None and handler_object is not None:
+            query_stats.handler = handler_object.callback.__name__
+        return await handler(event, data)
+
+
+class ReleaseConnectionRequestMiddleware(BaseRequestMiddleware):
+    """Перед запросом к Bot API отдаёт в пул соединение транзакции апдейта.
+
+    Запросы к БД до и после вызова Telegram идут в разных транзакциях, но
+    подряд идущие чтения делят одну: BEGIN и COMMIT на участок, а не на запрос.
+    Транзакция с записью не трогается: её фиксирует сервис или, в
+    unit_of_work, DBMiddleware в конце апдейта.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        holder_dao = _current_dao.get()
+        if holder_dao is not None:
+            await holder_dao.release_connection()
+        return await make_request(bot, method)
@@ -0,0 +1,153 @@
+import asyncio
+import datetime
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+from apscheduler.job import Job
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from src.services.delivery import DeliveryQueue
+from src.services.next_run_time_writer import NextRunTimeWriter
+from src.services.reminder_lookup import ReminderLookup
+from src.services.scheduler import (
+    SchedulerService,
+    render_reminder_message,
+    send_reminder_job,
+)
+from src.text.formatters.reminder_management import format_missed_reminders_summary
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MissedReminder:
+    reminder_id: int
+    missed_count: int
+    next_run_time: Optional[datetime.datetime]
+
+
+class ReminderCatchUp:
+    """Разбор задач, пропущенных за время простоя, без шквала срабатываний.
+
+    Пока планировщик на паузе, просроченные задачи переносятся на ближайшее
+    будущее срабатывание, а пропущенное досылается в фоне с ограниченной
+    скоростью. Если у пользователя пропущено больше coalesce_threshold
+    срабатываний, он получает одно сводное сообщение.
+    """
+
+    def __init__(
+        self,
+        scheduler: AsyncIOScheduler,
+        scheduler_service: SchedulerService,
+        reminder_lookup: ReminderLookup,
+        delivery_queue: DeliveryQueue,
+        rate: float = 5.0,
+        coalesce_threshold: int = 3,
+        max_counted_runs: int = 1000,
+        next_run_time_writer: Optional[NextRunTimeWriter] = None,
+    ):
+        self.scheduler = scheduler
+        self.scheduler_service = scheduler_service
+        self.reminder_lookup = reminder_lookup
+        self.delivery_queue = delivery_queue
+        self.rate = rate
+        self.coalesce_threshold = coalesce_threshold
+        self.max_counted_runs = max_counted_runs
+        self.next_run_time_writer = next_run_time_writer
+        self._task: Optional[asyncio.Task] = None
+
+    async def run(self) -> None:
+        # Повторный запуск (например, после смены лидера) заменяет прежний разбор
+        await self.stop()
+        now = datetime.datetime.now(self.scheduler.timezone)
+        # Синхронный клиент jobstore не должен блокировать цикл событий
+        backlog = await asyncio.to_thread(self._collect_backlog, now)
+        if not backlog:
+            return
+
+        # Сдвигаем задачи до возобновления планировщика, чтобы он их не запускал
+        await self.scheduler_service.resume_all_user_jobs(list(backlog))
+        if self.next_run_time_writer is not None:
+            for item in backlog.values():
+                self.next_run_time_writer.record(item.reminder_id, item.next_run_time)
+        logger.info(
+            f"Catch-up: {len(backlog)} overdue reminder job(s) rescheduled, "
+            f"{sum(item.missed_count for item in backlog.values())} missed run(s) to replay."
+        )
+        self._task = asyncio.create_task(
+            self._replay(list(backlog.values())), name="reminder-catch-up"
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _collect_backlog(self, now: datetime.datetime) -> dict[str, MissedReminder]:
+        backlog = {}
+        jobstore = self.scheduler._lookup_jobstore("default")
+        for job in jobstore.get_due_jobs(now):
+            if job.func is not send_reminder_job or "reminder_id" not in job.kwargs:
+                continue
+            # Опоздание в пределах misfire_grace_time планировщик отработает сам
+            if job.misfire_grace_time is None or now - job.next_run_time <= (
+                datetime.timedelta(seconds=job.misfire_grace_time)
+            ):
+                continue
+            backlog[job.id] = MissedReminder(
+                reminder_id=job.kwargs["reminder_id"],
+                missed_count=self._count_missed_runs(job, now),
+                next_run_time=job.trigger.get_next_fire_time(None, now),
+            )
+        return backlog
+
+    def _count_missed_runs(self, job: Job, now: datetime.datetime) -> int:
+        count = 0
+        run_time = job.next_run_time
+        while run_time is not None and run_time <= now:
+            count += 1
+            if count >= self.max_counted_runs:
+                break
+            run_time = job.trigger.get_next_fire_time(run_time, now)
+        return count
+
+    async def _replay(self, backlog: list[MissedReminder]) -> None:
+        by_user = defaultdict(list)
+        for item in backlog:
+            reminder = await self.reminder_lookup.get(item.reminder_id)
+            if reminder is None or not reminder.is_active:
+                continue
+            by_user[reminder.tg_user_id].append((reminder, item))
+            # Отдаём управление циклу, чтобы не задерживать обработку апдейтов
+            await asyncio.sleep(0)
+
+        rejected = 0
+        for tg_user_id, missed in by_user.items():
+            total_missed = sum(item.missed_count for _, item in missed)
+            if total_missed > self.coalesce_threshold:
+                text = format_missed_reminders_summary(
+                    [(reminder.text, item.missed_count) for reminder, item in missed]
+                )
+                rejected += not await self._send(tg_user_id, text)
+                continue
+            for reminder, item in missed:
+                text, keyboard = render_reminder_message(
+                    reminder.reminder_id, reminder.text, True, item.next_run_time
+                )
+                rejected += not await self._send(tg_user_id, text, keyboard)
+        logger.info(
+            f"Catch-up finished for {len(by_user)} user(s), "
+            f"{rejected} message(s) rejected by the delivery queue."
+        )
+
+    async def _send(self, tg_user_id: int, text: str, reply_markup=None) -> bool:
+        queued = self.delivery_queue.enqueue(tg_user_id, text, reply_markup)
+        if not queued:
+            logger.warning(f"Catch-up message to user_id={tg_user_id} was not queued")
+        await asyncio.sleep(1 / self.rate)
+        return queued
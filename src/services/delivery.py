@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from aiogram import Bot, exceptions
+from aiogram.types import InlineKeyboardMarkup
+
+from src.services.metrics import (
+    DELIVERY_FAILURES,
+    DELIVERY_QUEUE_WAIT,
+    DELIVERY_SEND_LATENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutgoingMessage:
+    chat_id: int
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+    # Выпущено из очереди ожидания своего чата и идёт раньше новых сообщений
+    released: bool = False
+
+
+@dataclass
+class DeliveryStats:
+    enqueued: int = 0
+    sent: int = 0
+    failed: int = 0
+    rejected: int = 0
+    retried: int = 0
+    retry_after_events: int = 0
+    queue_depth: int = 0
+    deferred: int = 0
+    in_flight: int = 0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class DeliveryQueue:
+    """Очередь исходящих сообщений между сработавшими задачами и Bot API.
+
+    Постановка в очередь синхронная и дешёвая. Отправкой занимается
+    ограниченное число воркеров: общий поток ограничен token bucket,
+    сообщения в один чат разносятся не чаще per_chat_interval, а при
+    TelegramRetryAfter вся отправка ставится на паузу. Сообщения в занятый
+    чат ждут в его собственной очереди, откуда по одному таймеру на чат
+    выпускаются по одному за per_chat_interval в порядке поступления.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: float = 30,
+        per_chat_interval: float = 1.0,
+        workers: int = 8,
+        max_size: int = 100_000,
+        max_attempts: int = 5,
+    ):
+        self.bot = bot
+        self.per_chat_interval = per_chat_interval
+        self.workers = workers
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self._bucket = TokenBucket(rate=global_rate)
+        self._queue: asyncio.Queue[OutgoingMessage] = asyncio.Queue()
+        self._chat_next_slot: dict[int, float] = {}
+        self._chat_waiting: dict[int, deque[OutgoingMessage]] = {}
+        self._chat_timers: dict[int, asyncio.TimerHandle] = {}
+        self._paused_until = 0.0
+        self._stats = DeliveryStats()
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def stats(self) -> DeliveryStats:
+        self._stats.queue_depth = self._queue.qsize()
+        return self._stats
+
+    def enqueue(
+        self,
+        chat_id: int,
+        text: str,
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+    ) -> bool:
+        if self._queue.qsize() + self._stats.deferred >= self.max_size:
+            self._stats.rejected += 1
+            logger.warning(
+                f"Delivery queue is full ({self.max_size}), message to chat_id={chat_id} rejected"
+            )
+            return False
+        self._queue.put_nowait(OutgoingMessage(chat_id, text, reply_markup))
+        self._stats.enqueued += 1
+        return True
+
+    def start(self) -> None:
+        for worker_id in range(self.workers):
+            self._tasks.append(
+                asyncio.create_task(
+                    self._run_worker(), name=f"delivery-worker-{worker_id}"
+                )
+            )
+        logger.info(f"Delivery queue started with {self.workers} worker(s).")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        for timer in self._chat_timers.values():
+            timer.cancel()
+        self._chat_timers.clear()
+        stats = self.stats
+        if stats.queue_depth or stats.deferred:
+            logger.warning(
+                f"Delivery queue stopped with {stats.queue_depth} queued and "
+                f"{stats.deferred} deferred messages."
+            )
+
+    async def _run_worker(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._process(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                DELIVERY_FAILURES.labels(exception=type(e).__name__).inc()
+                self._stats.failed += 1
+                logger.error(
+                    f"Unexpected delivery error for chat_id={message.chat_id}: {e}",
+                    exc_info=True,
+                )
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, message: OutgoingMessage) -> None:
+        now = time.monotonic()
+        released, message.released = message.released, False
+        if self._chat_next_slot.get(message.chat_id, 0.0) > now:
+            # Не держим воркер: сообщение подождёт в очереди своего чата
+            self._wait_for_chat(message, first=released)
+            return
+        if not released and message.chat_id in self._chat_waiting:
+            # Чат свободен, но его уже ждут более ранние сообщения
+            self._wait_for_chat(message)
+            return
+        self._chat_next_slot[message.chat_id] = now + self.per_chat_interval
+        self._forget_idle_chats(now)
+
+        await self._bucket.acquire()
+        # RetryAfter мог прийти, пока воркер ждал токен
+        while self._paused_until > (now := time.monotonic()):
+            await asyncio.sleep(self._paused_until - now)
+        # Пауза и ожидание токена могли сдвинуть фактическую отправку
+        self._chat_next_slot[message.chat_id] = (
+            time.monotonic() + self.per_chat_interval
+        )
+
+        message.attempts += 1
+        self._stats.in_flight += 1
+        started_at = time.monotonic()
+        try:
+            await self.bot.send_message(
+                chat_id=message.chat_id,
+                text=message.text,
+                reply_markup=message.reply_markup,
+            )
+        except exceptions.TelegramRetryAfter as e:
+            DELIVERY_FAILURES.labels(exception=type(e).__name__).inc()
+            self._stats.retry_after_events += 1
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + e.retry_after
+            )
+            logger.warning(
+                f"Flood limit is exceeded for chat_id={message.chat_id}. "
+                f"Pausing delivery for {e.retry_after} seconds."
+            )
+            self._retry(message, e.retry_after)
+        except (exceptions.TelegramNetworkError, exceptions.TelegramServerError) as e:
+            DELIVERY_FAILURES.labels(exception=type(e).__name__).inc()
+            logger.warning(
+                f"Transient error delivering to chat_id={message.chat_id}: {e}"
+            )
+            self._retry(message, 2**message.attempts)
+        except exceptions.TelegramAPIError as e:
+            DELIVERY_FAILURES.labels(exception=type(e).__name__).inc()
+            self._stats.failed += 1
+            logger.error(f"Target [ID:{message.chat_id}]: delivery failed: {e}")
+        else:
+            finished_at = time.monotonic()
+            DELIVERY_SEND_LATENCY.observe(finished_at - started_at)
+            DELIVERY_QUEUE_WAIT.observe(finished_at - message.enqueued_at)
+            self._stats.sent += 1
+        finally:
+            self._stats.in_flight -= 1
+
+    def _retry(self, message: OutgoingMessage, delay: float) -> None:
+        if message.attempts >= self.max_attempts:
+            self._stats.failed += 1
+            logger.error(
+                f"Giving up delivery to chat_id={message.chat_id} after {message.attempts} attempts"
+            )
+            return
+        self._stats.retried += 1
+        self._defer(message, delay)
+
+    def _defer(self, message: OutgoingMessage, delay: float) -> None:
+        self._stats.deferred += 1
+        asyncio.get_running_loop().call_later(delay, self._requeue, message)
+
+    def _requeue(self, message: OutgoingMessage) -> None:
+        self._stats.deferred -= 1
+        self._queue.put_nowait(message)
+
+    def _wait_for_chat(self, message: OutgoingMessage, first: bool = False) -> None:
+        waiting = self._chat_waiting.setdefault(message.chat_id, deque())
+        if first:
+            waiting.appendleft(message)
+        else:
+            waiting.append(message)
+        self._stats.deferred += 1
+        if message.chat_id not in self._chat_timers:
+            delay = self._chat_next_slot.get(message.chat_id, 0.0) - time.monotonic()
+            self._chat_timers[message.chat_id] = asyncio.get_running_loop().call_later(
+                max(delay, 0.0), self._release_chat, message.chat_id
+            )
+
+    def _release_chat(self, chat_id: int) -> None:
+        del self._chat_timers[chat_id]
+        waiting = self._chat_waiting[chat_id]
+        message = waiting.popleft()
+        message.released = True
+        self._stats.deferred -= 1
+        self._queue.put_nowait(message)
+        if not waiting:
+            del self._chat_waiting[chat_id]
+            return
+        self._chat_timers[chat_id] = asyncio.get_running_loop().call_later(
+            self.per_chat_interval, self._release_chat, chat_id
+        )
+
+    def _forget_idle_chats(self, now: float) -> None:
+        if len(self._chat_next_slot) < 10_000:
+            return
+        self._chat_next_slot = {
+            chat_id: slot
+            for chat_id, slot in self._chat_next_slot.items()
+            if slot > now
+        }
@@ -0,0 +1,206 @@
+import asyncio
+import datetime
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database.dao.reminder import ReminderDAO
+from src.database.models.reminder import Reminder
+from src.services.delivery import DeliveryQueue
+from src.services.metrics import REMINDER_FIRE_LAG, REMINDER_MISFIRES
+from src.services.scheduler import SchedulerService, render_reminder_message
+from src.utils.datetime_utils import calculate_next_run_time, create_trigger_args
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DispatchJob:
+    id: str
+    next_run_time: Optional[datetime.datetime]
+
+
+class DatabaseSchedulerService(SchedulerService):
+    """SchedulerService для режима, в котором очередью служит таблица reminders.
+
+    Задачи в jobstore не создаются: достаточно id и next_run_time в строке
+    напоминания, а статус берётся из reminders.is_active.
+    """
+
+    async def add_reminder_job(
+        self, reminder: Reminder, tg_user_id: int, trigger_type, trigger_args
+    ) -> DispatchJob | None:
+        try:
+            next_run_time = calculate_next_run_time(trigger_type, trigger_args)
+        except Exception as e:
+            logger.error(
+                f"Error calculating next run time for reminder {reminder.id}: {e}",
+                exc_info=True,
+            )
+            return None
+        logger.info(
+            f"Reminder {reminder.id} queued in database. Next run: {next_run_time}"
+        )
+        return DispatchJob(id=uuid.uuid4().hex, next_run_time=next_run_time)
+
+    async def remove_job(self, job_id: str) -> bool:
+        return True
+
+    async def pause_job(self, job_id: str) -> bool:
+        return True
+
+    async def resume_job(self, job_id: str) -> bool:
+        return True
+
+    async def pause_all_user_jobs(self, job_ids: List[str]) -> dict[str, bool]:
+        return {job_id: True for job_id in job_ids if job_id}
+
+    async def resume_all_user_jobs(self, job_ids: List[str]) -> dict[str, bool]:
+        return {job_id: True for job_id in job_ids if job_id}
+
+    async def remove_all_user_jobs(self, job_ids: List[str]) -> dict[str, bool]:
+        return {job_id: True for job_id in job_ids if job_id}
+
+    async def get_job_by_id(self, job_id: str) -> None:
+        return None
+
+    async def get_next_run_time(self, job_id: str) -> None:
+        return None
+
+    async def remove_all_jobs(self):
+        return None
+
+    async def reset_job_start_time(
+        self, job_id: str, trigger_type: str, trigger_args: dict
+    ) -> bool:
+        return True
+
+
+class ReminderDispatcher:
+    """Забирает наступившие напоминания пачками через SELECT ... FOR UPDATE SKIP LOCKED.
+
+    Постановка в очередь доставки и сдвиг next_run_time происходят в одной
+    транзакции, поэтому любое число воркеров (в том числе в разных процессах)
+    не отправит одно напоминание дважды.
+    """
+
+    def __init__(
+        self,
+        pool: async_sessionmaker[AsyncSession],
+        delivery_queue: DeliveryQueue,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        workers: int = 1,
+        misfire_grace_time: int = 60 * 5,
+    ):
+        self.pool = pool
+        self.delivery_queue = delivery_queue
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.workers = workers
+        self.misfire_grace_time = datetime.timedelta(seconds=misfire_grace_time)
+        self.timezone = ZoneInfo("Europe/Moscow")
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        for worker_id in range(self.workers):
+            self._tasks.append(
+                asyncio.create_task(
+                    self._run_worker(worker_id), name=f"reminder-dispatcher-{worker_id}"
+                )
+            )
+        logger.info(f"Reminder dispatcher started with {self.workers} worker(s).")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _run_worker(self, worker_id: int) -> None:
+        while True:
+            try:
+                claimed = await self.dispatch_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    f"Dispatcher worker {worker_id} failed to process batch: {e}",
+                    exc_info=True,
+                )
+                claimed = 0
+            # Полная пачка означает, что очередь не разобрана - забираем следующую сразу
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def dispatch_batch(self) -> int:
+        now = datetime.datetime.now(self.timezone)
+        async with self.pool() as session:
+            reminder_dao = ReminderDAO(session)
+            rows = await reminder_dao.claim_due_reminders(now, self.batch_size)
+            if not rows:
+                return 0
+
+            next_run_times = {}
+            delivered = 0
+            for reminder, tg_user_id in rows:
+                next_run_time = self._get_following_run_time(reminder, now)
+                next_run_times[reminder.id] = next_run_time
+                lag = now - reminder.next_run_time
+                if lag > self.misfire_grace_time:
+                    REMINDER_MISFIRES.labels(engine="database").inc()
+                    logger.warning(
+                        f"Run time of reminder {reminder.id} was missed by {lag}"
+                    )
+                    continue
+                REMINDER_FIRE_LAG.labels(engine="database").observe(lag.total_seconds())
+                if self._deliver(reminder, tg_user_id, next_run_time):
+                    delivered += 1
+
+            await reminder_dao.update_next_run_times(next_run_times)
+            await session.commit()
+
+        logger.info(f"Dispatched {delivered} of {len(rows)} claimed reminders.")
+        return len(rows)
+
+    def _get_following_run_time(
+        self, reminder: Reminder, now: datetime.datetime
+    ) -> datetime.datetime | None:
+        try:
+            trigger_type, trigger_args = create_trigger_args(
+                frequency_type=reminder.frequency_type.name.lower(),
+                start_datetime=reminder.start_datetime.astimezone(self.timezone),
+                custom_frequency=reminder.custom_frequency,
+            )
+            after = max(
+                now, reminder.next_run_time + datetime.timedelta(microseconds=1)
+            )
+            return calculate_next_run_time(trigger_type, trigger_args, now=after)
+        except Exception as e:
+            logger.error(
+                f"Error calculating next run time for reminder {reminder.id}: {e}",
+                exc_info=True,
+            )
+            return None
+
+    def _deliver(
+        self,
+        reminder: Reminder,
+        tg_user_id: int,
+        next_run_time: datetime.datetime | None,
+    ) -> bool:
+        try:
+            formatted_text, keyboard = render_reminder_message(
+                reminder.id, reminder.text, reminder.is_active, next_run_time
+            )
+            return self.delivery_queue.enqueue(tg_user_id, formatted_text, keyboard)
+        except Exception as e:
+            logger.error(
+                f"Error delivering reminder {reminder.id} to user_id={tg_user_id}: {e}",
+                exc_info=True,
+            )
+            return False
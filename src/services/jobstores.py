@@ -0,0 +1,423 @@
+import heapq
+import pickle
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, ConflictingIdError, JobLookupError
+from apscheduler.jobstores.redis import RedisJobStore
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+from redis import Redis
+
+
+# Сравнение с записью: задача перезаписывается, только если её состояние
+# в хэше не изменилось с момента чтения. ARGV четвёрками: id, прочитанное
+# состояние, новое состояние, время запуска ("" - задача на паузе).
+# Возвращает id задач, которые изменились или пропали.
+_SET_NEXT_RUN_TIMES_SCRIPT = """
+local changed = {}
+for i = 1, #ARGV, 4 do
+    local job_id = ARGV[i]
+    if redis.call('HGET', KEYS[1], job_id) == ARGV[i + 1] then
+        redis.call('HSET', KEYS[1], job_id, ARGV[i + 2])
+        if ARGV[i + 3] == '' then
+            redis.call('ZREM', KEYS[2], job_id)
+        else
+            redis.call('ZADD', KEYS[2], ARGV[i + 3], job_id)
+        end
+    else
+        table.insert(changed, job_id)
+    end
+end
+return changed
+"""
+
+
+class BatchRedisJobStore(RedisJobStore):
+    """RedisJobStore с пакетными операциями над группой задач.
+
+    Каждая операция укладывается в фиксированное число обращений к Redis
+    независимо от количества задач: HMGET для чтения и один Lua-скрипт для
+    записи. Скрипт сравнивает состояние каждой задачи с прочитанным, поэтому
+    конфликт с планировщиком, перезаписавшим задачу после срабатывания,
+    заставляет перечитать только эту задачу, а не всю группу. Число попыток
+    ограничено max_attempts; задачи, которые так и не удалось записать,
+    возвращаются как неуспешные.
+    """
+
+    max_attempts = 3
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._set_next_run_times_script = self.redis.register_script(
+            _SET_NEXT_RUN_TIMES_SCRIPT
+        )
+
+    def pause_jobs(self, job_ids: list[str]) -> dict[str, bool]:
+        return self._set_next_run_times(job_ids, lambda job: None)
+
+    def resume_jobs(self, job_ids: list[str], now: datetime) -> dict[str, bool]:
+        return self._set_next_run_times(
+            job_ids, lambda job: job.trigger.get_next_fire_time(None, now)
+        )
+
+    def remove_jobs(self, job_ids: list[str]) -> dict[str, bool]:
+        if not job_ids:
+            return {}
+        with self.redis.pipeline() as pipe:
+            for job_id in job_ids:
+                pipe.hdel(self.jobs_key, job_id)
+            pipe.zrem(self.run_times_key, *job_ids)
+            removed = pipe.execute()
+        return {job_id: bool(count) for job_id, count in zip(job_ids, removed)}
+
+    def _set_next_run_times(
+        self,
+        job_ids: list[str],
+        get_next_run_time: Callable[[Job], Optional[datetime]],
+    ) -> dict[str, bool]:
+        results = {job_id: False for job_id in job_ids}
+        pending = list(dict.fromkeys(job_ids))
+        for _ in range(self.max_attempts):
+            if not pending:
+                break
+            job_states = self.redis.hmget(self.jobs_key, *pending)
+            args = []
+            for job_id, job_state in zip(pending, job_states):
+                if job_state is None:
+                    continue
+                try:
+                    job = self._reconstitute_job(job_state)
+                    next_run_time = get_next_run_time(job)
+                    job._modify(next_run_time=next_run_time)
+                except Exception:
+                    self._logger.exception(f"Unable to update job {job_id}")
+                    continue
+                args += [
+                    job_id,
+                    job_state,
+                    pickle.dumps(job.__getstate__(), self.pickle_protocol),
+                    (
+                        repr(datetime_to_utc_timestamp(next_run_time))
+                        if next_run_time
+                        else ""
+                    ),
+                ]
+            if not args:
+                break
+            changed = {
+                job_id.decode()
+                for job_id in self._set_next_run_times_script(
+                    keys=[self.jobs_key, self.run_times_key], args=args
+                )
+            }
+            written = args[::4]
+            for job_id in written:
+                results[job_id] = job_id not in changed
+            pending = [job_id for job_id in written if job_id in changed]
+        if pending:
+            self._logger.warning(
+                f"Jobs {pending} kept changing, gave up after {self.max_attempts} attempts"
+            )
+        return results
+
+
+class HybridJobStore(BaseJobStore):
+    """Рабочий набор задач в памяти процесса, надёжность - через журнал в Redis.
+
+    Состояния задач лежат в словаре по id, порядок срабатываний - в куче
+    (next_run_time, id) с ленивым удалением устаревших записей, поэтому
+    чтения не ходят в Redis. Каждое изменение дописывается в список-журнал
+    (RPUSH). Когда журнал дорастает до размера рабочего набора, в фоновом
+    потоке пишется снимок и журнал обрезается на вошедшие в него записи.
+    При старте состояние восстанавливается из снимка и журнала, а если их
+    нет - из хэша RedisJobStore (legacy_jobs_key).
+
+    Рассчитан на единственный процесс, исполняющий задачи: изменения других
+    процессов он не увидит.
+    """
+
+    def __init__(
+        self,
+        db=0,
+        snapshot_key="apscheduler.snapshot",
+        log_key="apscheduler.log",
+        legacy_jobs_key="apscheduler.jobs",
+        min_snapshot_ops=1000,
+        pickle_protocol=pickle.HIGHEST_PROTOCOL,
+        **connect_args,
+    ):
+        super().__init__()
+        self.snapshot_key = snapshot_key
+        self.log_key = log_key
+        self.legacy_jobs_key = legacy_jobs_key
+        self.min_snapshot_ops = min_snapshot_ops
+        self.pickle_protocol = pickle_protocol
+        self.redis = Redis(db=int(db), **connect_args)
+        self._states: dict[str, bytes] = {}
+        self._run_times: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._log_length = 0
+        self._lock = threading.RLock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def start(self, scheduler, alias):
+        super().start(scheduler, alias)
+        self._load()
+
+    def shutdown(self):
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        self.redis.connection_pool.disconnect()
+
+    def lookup_job(self, job_id):
+        job_state = self._states.get(job_id)
+        return self._reconstitute_job(job_state) if job_state else None
+
+    def get_due_jobs(self, now):
+        timestamp = datetime_to_utc_timestamp(now)
+        with self._lock:
+            due = []
+            while self._heap and self._heap[0][0] <= timestamp:
+                entry = heapq.heappop(self._heap)
+                if self._run_times.get(entry[1]) == entry[0]:
+                    due.append(entry)
+            for entry in due:
+                heapq.heappush(self._heap, entry)
+            return self._reconstitute_jobs(
+                (job_id, self._states[job_id]) for _, job_id in due
+            )
+
+    def get_next_run_time(self):
+        with self._lock:
+            while self._heap:
+                run_time, job_id = self._heap[0]
+                if self._run_times.get(job_id) == run_time:
+                    return utc_timestamp_to_datetime(run_time)
+                heapq.heappop(self._heap)
+        return None
+
+    def get_all_jobs(self):
+        with self._lock:
+            jobs = self._reconstitute_jobs(list(self._states.items()))
+        paused_sort_key = datetime(9999, 12, 31, tzinfo=timezone.utc)
+        return sorted(jobs, key=lambda job: job.next_run_time or paused_sort_key)
+
+    def add_job(self, job):
+        with self._lock:
+            if job.id in self._states:
+                raise ConflictingIdError(job.id)
+            self._put_jobs([job])
+
+    def update_job(self, job):
+        with self._lock:
+            if job.id not in self._states:
+                raise JobLookupError(job.id)
+            self._put_jobs([job])
+
+    def remove_job(self, job_id):
+        with self._lock:
+            if job_id not in self._states:
+                raise JobLookupError(job_id)
+            self._delete_jobs([job_id])
+
+    def remove_all_jobs(self):
+        with self._lock:
+            self._append_log([("clear", None, None)])
+            self._states.clear()
+            self._run_times.clear()
+            self._heap.clear()
+            self._maybe_snapshot()
+
+    def pause_jobs(self, job_ids: list[str]) -> dict[str, bool]:
+        return self._set_next_run_times(job_ids, lambda job: None)
+
+    def resume_jobs(self, job_ids: list[str], now: datetime) -> dict[str, bool]:
+        return self._set_next_run_times(
+            job_ids, lambda job: job.trigger.get_next_fire_time(None, now)
+        )
+
+    def remove_jobs(self, job_ids: list[str]) -> dict[str, bool]:
+        with self._lock:
+            existing = [job_id for job_id in job_ids if job_id in self._states]
+            self._delete_jobs(existing)
+        return {job_id: job_id in existing for job_id in job_ids}
+
+    def _set_next_run_times(
+        self,
+        job_ids: list[str],
+        get_next_run_time: Callable[[Job], Optional[datetime]],
+    ) -> dict[str, bool]:
+        results = {}
+        jobs = []
+        with self._lock:
+            for job_id in job_ids:
+                job = self.lookup_job(job_id)
+                if job is None:
+                    results[job_id] = False
+                    continue
+                try:
+                    job._modify(next_run_time=get_next_run_time(job))
+                except Exception:
+                    self._logger.exception(f"Unable to update job {job_id}")
+                    results[job_id] = False
+                    continue
+                jobs.append(job)
+                results[job_id] = True
+            self._put_jobs(jobs)
+        return results
+
+    def _put_jobs(self, jobs: list[Job]) -> None:
+        states = [
+            (job, pickle.dumps(job.__getstate__(), self.pickle_protocol))
+            for job in jobs
+        ]
+        # Сначала журнал: если запись в Redis не удалась, память не меняется
+        self._append_log([("put", job.id, job_state) for job, job_state in states])
+        for job, job_state in states:
+            self._index(job.id, job_state, job.next_run_time)
+        self._maybe_snapshot()
+
+    def _delete_jobs(self, job_ids: list[str]) -> None:
+        self._append_log([("del", job_id, None) for job_id in job_ids])
+        for job_id in job_ids:
+            self._states.pop(job_id, None)
+            self._run_times.pop(job_id, None)
+        self._maybe_snapshot()
+
+    def _index(
+        self, job_id: str, job_state: bytes, next_run_time: Optional[datetime]
+    ) -> None:
+        self._states[job_id] = job_state
+        if next_run_time is None:
+            self._run_times.pop(job_id, None)
+            return
+        timestamp = datetime_to_utc_timestamp(next_run_time)
+        if self._run_times.get(job_id) == timestamp:
+            return
+        self._run_times[job_id] = timestamp
+        heapq.heappush(self._heap, (timestamp, job_id))
+        # Устаревшие записи уходят из кучи по мере срабатываний, но перенос
+        # задач на далёкое будущее может их копить
+        if len(self._heap) > 2 * len(self._run_times) + 1000:
+            self._heap = [(ts, job_id) for job_id, ts in self._run_times.items()]
+            heapq.heapify(self._heap)
+
+    def _append_log(self, entries: list[tuple]) -> None:
+        if not entries:
+            return
+        self.redis.rpush(
+            self.log_key,
+            *(pickle.dumps(entry, self.pickle_protocol) for entry in entries),
+        )
+        self._log_length += len(entries)
+
+    def _maybe_snapshot(self) -> None:
+        # Вызывается после изменения памяти: снимок должен включать всё,
+        # что покрывает обрезаемая часть журнала
+        if self._log_length < max(self.min_snapshot_ops, len(self._states)):
+            return
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return
+        self._snapshot_thread = threading.Thread(
+            target=self._write_snapshot,
+            args=(dict(self._states), self._log_length),
+            name="jobstore-snapshot",
+            daemon=True,
+        )
+        self._snapshot_thread.start()
+
+    def _write_snapshot(self, states: dict[str, bytes], log_length: int) -> None:
+        temp_key = f"{self.snapshot_key}.tmp"
+        try:
+            with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(temp_key)
+                items = list(states.items())
+                for start in range(0, len(items), 1000):
+                    pipe.hset(temp_key, mapping=dict(items[start : start + 1000]))
+                pipe.execute()
+            # Подмена снимка и обрезка журнала атомарны: после сбоя останется
+            # либо старый снимок с полным журналом, либо новый с остатком
+            with self.redis.pipeline() as pipe:
+                if states:
+                    pipe.rename(temp_key, self.snapshot_key)
+                else:
+                    pipe.delete(self.snapshot_key)
+                pipe.ltrim(self.log_key, log_length, -1)
+                pipe.execute()
+        except Exception:
+            self._logger.exception("Unable to write jobstore snapshot")
+            return
+        with self._lock:
+            self._log_length -= log_length
+        self._logger.info(f"Jobstore snapshot written with {len(states)} jobs")
+
+    def _load(self) -> None:
+        snapshot = self.redis.hgetall(self.snapshot_key)
+        log = self.redis.lrange(self.log_key, 0, -1)
+        migrate = not snapshot and not log and self.legacy_jobs_key
+        if migrate:
+            snapshot = self.redis.hgetall(self.legacy_jobs_key)
+
+        states = {job_id.decode(): job_state for job_id, job_state in snapshot.items()}
+        for entry in log:
+            op, job_id, job_state = pickle.loads(entry)
+            if op == "put":
+                states[job_id] = job_state
+            elif op == "del":
+                states.pop(job_id, None)
+            elif op == "clear":
+                states.clear()
+
+        with self._lock:
+            self._states.clear()
+            self._run_times.clear()
+            self._heap.clear()
+            self._log_length = len(log)
+            for job_id, job_state in states.items():
+                try:
+                    next_run_time = pickle.loads(job_state)["next_run_time"]
+                except Exception:
+                    self._logger.exception(
+                        f'Unable to restore job "{job_id}" -- skipping it'
+                    )
+                    continue
+                self._index(job_id, job_state, next_run_time)
+
+        if migrate and states:
+            self._write_snapshot(dict(self._states), 0)
+        self._logger.info(
+            f"Jobstore restored {len(self._states)} jobs "
+            f"({len(snapshot)} from snapshot, {len(log)} log entries)"
+        )
+
+    def _reconstitute_job(self, job_state):
+        job_state = pickle.loads(job_state)
+        job = Job.__new__(Job)
+        job.__setstate__(job_state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _reconstitute_jobs(self, job_states) -> list[Job]:
+        jobs = []
+        failed_job_ids = []
+        for job_id, job_state in job_states:
+            try:
+                jobs.append(self._reconstitute_job(job_state))
+            except BaseException:
+                self._logger.exception(
+                    f'Unable to restore job "{job_id}" -- removing it'
+                )
+                failed_job_ids.append(job_id)
+        if failed_job_ids:
+            with self._lock:
+                self._delete_jobs(failed_job_ids)
+        return jobs
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}>"
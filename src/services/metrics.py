@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Optional
+
+from aiohttp import web
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MISSED, JobExecutionEvent
+from apscheduler.jobstores.redis import RedisJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.services.jobstores import HybridJobStore
+
+if TYPE_CHECKING:
+    from src.services.delivery import DeliveryQueue
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REMINDER_FIRE_LAG = Histogram(
+    "reminder_fire_lag_seconds",
+    "Задержка фактического срабатывания напоминания относительно запланированного",
+    ["engine"],
+    buckets=LAG_BUCKETS,
+)
+REMINDER_MISFIRES = Counter(
+    "reminder_misfires_total",
+    "Срабатывания, пропущенные дальше misfire_grace_time",
+    ["engine"],
+)
+SCHEDULER_JOB_ERRORS = Counter(
+    "scheduler_job_errors_total",
+    "Задачи планировщика, завершившиеся исключением",
+)
+DELIVERY_SEND_LATENCY = Histogram(
+    "delivery_send_latency_seconds",
+    "Длительность вызова sendMessage в Bot API",
+    buckets=LATENCY_BUCKETS,
+)
+DELIVERY_QUEUE_WAIT = Histogram(
+    "delivery_queue_wait_seconds",
+    "Время от постановки сообщения в очередь до успешной отправки",
+    buckets=LAG_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Ожидание свободного соединения в пуле БД",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "Запросы соединения, не дождавшиеся его за pool_timeout",
+    ["pool"],
+)
+DB_STATEMENTS_PER_UPDATE = Histogram(
+    "db_statements_per_update",
+    "SQL-запросы на обработку одного апдейта",
+    ["handler"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_TIME_PER_UPDATE = Histogram(
+    "db_time_per_update_seconds",
+    "Суммарное время SQL-запросов на обработку одного апдейта",
+    ["handler"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_REPEATED_STATEMENTS = Counter(
+    "db_repeated_statements_total",
+    "Запросы, повторённые в одном апдейте не меньше порога N+1",
+    ["handler"],
+)
+DELIVERY_FAILURES = Counter(
+    "delivery_failures_total",
+    "Ошибки отправки сообщений по типу исключения",
+    ["exception"],
+)
+
+
+def record_scheduler_event(event: JobExecutionEvent) -> None:
+    if event.code == EVENT_JOB_MISSED:
+        REMINDER_MISFIRES.labels(engine="apscheduler").inc()
+    elif event.code == EVENT_JOB_ERROR:
+        SCHEDULER_JOB_ERRORS.inc()
+
+
+def setup_scheduler_metrics(scheduler: AsyncIOScheduler) -> None:
+    scheduler.add_listener(record_scheduler_event, EVENT_JOB_MISSED | EVENT_JOB_ERROR)
+
+
+class RuntimeCollector(Collector):
+    """Снимает состояние jobstore, очереди доставки и пулов БД в момент запроса метрик."""
+
+    def __init__(
+        self,
+        scheduler: Optional[AsyncIOScheduler] = None,
+        delivery_queue: Optional["DeliveryQueue"] = None,
+        db_engines: Optional[dict[str, AsyncEngine]] = None,
+    ):
+        self.scheduler = scheduler
+        self.delivery_queue = delivery_queue
+        self.db_engines = db_engines or {}
+
+    def collect(self):
+        if self.scheduler is not None:
+            jobs = GaugeMetricFamily(
+                "scheduler_jobs", "Количество задач в jobstore", labels=["jobstore"]
+            )
+            for alias, jobstore in self.scheduler._jobstores.items():
+                try:
+                    jobs.add_metric([alias], self._count_jobs(jobstore))
+                except Exception as e:
+                    logger.warning(f"Unable to count jobs in jobstore {alias}: {e}")
+            yield jobs
+
+        if self.delivery_queue is not None:
+            stats = self.delivery_queue.stats
+            for name, value, description in (
+                ("delivery_queue_depth", stats.queue_depth, "Сообщения в очереди"),
+                ("delivery_deferred", stats.deferred, "Отложенные сообщения"),
+                (
+                    "delivery_in_flight",
+                    stats.in_flight,
+                    "Сообщения в процессе отправки",
+                ),
+            ):
+                yield GaugeMetricFamily(name, description, value=value)
+            messages = CounterMetricFamily(
+                "delivery_messages",
+                "Сообщения очереди доставки по результату",
+                labels=["outcome"],
+            )
+            for outcome in ("enqueued", "sent", "failed", "rejected", "retried"):
+                messages.add_metric([outcome], getattr(stats, outcome))
+            yield messages
+
+        if self.db_engines:
+            pool_metrics = {
+                "db_pool_size": ("Размер пула БД", lambda pool: pool.size()),
+                "db_pool_checked_out": (
+                    "Соединения, выданные из пула БД",
+                    lambda pool: pool.checkedout(),
+                ),
+                "db_pool_overflow": (
+                    "Соединения сверх pool_size",
+                    lambda pool: max(pool.overflow(), 0),
+                ),
+            }
+            for name, (description, get_value) in pool_metrics.items():
+                family = GaugeMetricFamily(name, description, labels=["pool"])
+                for pool_name, engine in self.db_engines.items():
+                    # engine.dispose() подменяет пул, поэтому берём текущий
+                    family.add_metric([pool_name], get_value(engine.sync_engine.pool))
+                yield family
+
+    @staticmethod
+    def _count_jobs(jobstore) -> int:
+        if isinstance(jobstore, RedisJobStore):
+            return jobstore.redis.hlen(jobstore.jobs_key)
+        if isinstance(jobstore, HybridJobStore):
+            return len(jobstore)
+        return len(jobstore.get_all_jobs())
+
+
+class MetricsServer:
+    """HTTP-эндпоинт /metrics в текстовом формате Prometheus."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9101, registry=REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(
+            f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics"
+        )
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        # Коллекторы ходят в Redis синхронным клиентом, поэтому не в цикле событий
+        body = await asyncio.to_thread(generate_latest, self.registry)
+        return web.Response(
+            body=body,
+            headers={"Content-Type": CONTENT_TYPE_LATEST},
+        )
@@ -0,0 +1,90 @@
+import asyncio
+import datetime
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database.dao.reminder import ReminderDAO
+
+logger = logging.getLogger(__name__)
+
+
+class NextRunTimeWriter:
+    """Отложенная пакетная запись reminders.next_run_time после срабатываний.
+
+    Сработавшие задачи только кладут новое время в буфер (последнее значение
+    для напоминания побеждает), а фоновая задача раз в flush_interval секунд
+    или при заполнении буфера записывает всё одним UPDATE ... FROM (VALUES ...).
+    """
+
+    def __init__(
+        self,
+        pool: async_sessionmaker[AsyncSession],
+        flush_interval: float = 5.0,
+        max_pending: int = 1000,
+    ):
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: dict[int, Optional[datetime.datetime]] = {}
+        self._flush_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self, reminder_id: int, next_run_time: Optional[datetime.datetime]
+    ) -> None:
+        self._pending[reminder_id] = next_run_time
+        if len(self._pending) >= self.max_pending:
+            self._flush_requested.set()
+
+    def discard(self, *reminder_ids: int) -> None:
+        # Время, записанное напрямую (сброс, удаление), важнее отложенного
+        for reminder_id in reminder_ids:
+            self._pending.pop(reminder_id, None)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="next-run-time-writer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with self.pool() as session:
+                await ReminderDAO(session).update_next_run_times(
+                    batch, only_forward=True
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(
+                f"Failed to flush next run times for {len(batch)} reminders: {e}",
+                exc_info=True,
+            )
+            # Возвращаем пачку, не затирая значения, пришедшие во время записи
+            self._pending = {**batch, **self._pending}
+            return 0
+        logger.debug(f"Flushed next run times for {len(batch)} reminders.")
+        return len(batch)
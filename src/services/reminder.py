@@ -4,9 +4,18 @@ from zoneinfo import ZoneInfo
 
 from src.database.dao.holder import HolderDAO
 from src.database.models.reminder import Reminder
-from src.dto.reminder import CreateReminderDTO, GetReminderToShowDTO
+from src.dto.reminder import (
+    CreateReminderDTO,
+    GetReminderToShowDTO,
+    ReminderPage,
+    ReminderPageKey,
+)
+from src.enums.reminder import ReminderListFilter
+from src.services.next_run_time_writer import NextRunTimeWriter
+from src.services.reminder_lookup import ReminderLookup
+from src.services.reminder_page_cache import ReminderPageCache
 from src.services.scheduler import SchedulerService
-from src.utils.datetime_utils import create_trigger_args
+from src.utils.datetime_utils import calculate_next_run_time, create_trigger_args
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +24,24 @@ class ReminderService:
     def __init__(
         self,
         scheduler_service: SchedulerService,
+        reminder_lookup: ReminderLookup | None = None,
+        next_run_time_writer: NextRunTimeWriter | None = None,
+        page_cache: ReminderPageCache | None = None,
     ):
         self.scheduler_service = scheduler_service
+        self.reminder_lookup = reminder_lookup
+        self.next_run_time_writer = next_run_time_writer
+        self.page_cache = page_cache
+
+    async def _invalidate_cached_reminders(self, *reminder_ids: int) -> None:
+        # Сработавшие задачи читают текст и статус через общий кэш
+        if self.reminder_lookup is not None:
+            await self.reminder_lookup.invalidate(*reminder_ids)
+
+    async def _invalidate_reminder_pages(self, user_id: int) -> None:
+        # Отрисованные списки пользователя перестают читаться со сменой версии
+        if self.page_cache is not None:
+            await self.page_cache.invalidate(user_id)
 
     async def create_reminder(
         self,
@@ -48,7 +73,7 @@ class ReminderService:
             logger.info(
                 f"Successfully created reminder {reminder.id} with job_id {job.id} and next run time {job.next_run_time}"
             )
-            print(reminder)
+            dao.on_commit(self._invalidate_reminder_pages, dto.db_user_id)
             await dao.base.commit()
 
             return reminder
@@ -63,8 +88,10 @@ class ReminderService:
     ):
         reminder = await dao.reminder.get_by_id(reminder_id)
         await dao.reminder.delete(reminder)
+        dao.on_commit(scheduler_service.remove_job, reminder.apscheduler_job_id)
+        dao.on_commit(self._invalidate_cached_reminders, reminder_id)
+        dao.on_commit(self._invalidate_reminder_pages, reminder.user_id)
         await dao.base.commit()
-        await scheduler_service.remove_job(reminder.apscheduler_job_id)
 
     async def get_user_reminder(self, dao: HolderDAO, reminder_id: int):
         return await dao.reminder.get_by_id(reminder_id)
@@ -83,108 +110,128 @@ class ReminderService:
         updated_reminder = await dao.reminder.update(
             reminder, {"next_run_time": next_run_time}
         )
+        dao.on_commit(self._invalidate_reminder_pages, reminder.user_id)
         await dao.base.commit()
         return GetReminderToShowDTO.from_dao(updated_reminder)
 
     async def disable_reminder(
         self, dao: HolderDAO, reminder_id: int, scheduler_service: SchedulerService
-    ) -> Reminder:
-        reminder = await dao.reminder.get_by_id(reminder_id)
-        await dao.reminder.update(reminder, {"is_active": False})
+    ) -> Reminder | None:
+        reminder = await dao.reminder.update_by_id(reminder_id, {"is_active": False})
+        if reminder is None:
+            logger.warning(f"Reminder {reminder_id} not found, nothing to disable")
+            return None
+        dao.on_commit(scheduler_service.pause_job, reminder.apscheduler_job_id)
+        dao.on_commit(self._invalidate_cached_reminders, reminder_id)
+        dao.on_commit(self._invalidate_reminder_pages, reminder.user_id)
         await dao.base.commit()
-        await scheduler_service.pause_job(reminder.apscheduler_job_id)
         return reminder
 
     async def enable_reminder(
         self, dao: HolderDAO, reminder_id: int, scheduler_service: SchedulerService
-    ) -> Reminder:
-        reminder = await dao.reminder.get_by_id(reminder_id)
-        await dao.reminder.update(reminder, {"is_active": True})
+    ) -> Reminder | None:
+        reminder = await dao.reminder.update_by_id(reminder_id, {"is_active": True})
+        if reminder is None:
+            logger.warning(f"Reminder {reminder_id} not found, nothing to enable")
+            return None
+        dao.on_commit(scheduler_service.resume_job, reminder.apscheduler_job_id)
+        dao.on_commit(self._invalidate_cached_reminders, reminder_id)
+        dao.on_commit(self._invalidate_reminder_pages, reminder.user_id)
         await dao.base.commit()
-        await scheduler_service.resume_job(reminder.apscheduler_job_id)
         return reminder
 
-    async def get_all_user_reminders(self, dao: HolderDAO, user_id: int):
-        try:
-            all_reminders = await dao.reminder.get_all_user_reminders(user_id)
-            return all_reminders
-        except Exception as e:
-            logger.error(f"Error getting all reminders: {e}", exc_info=True)
-            return None
-
-    async def get_active_user_reminders(
-        self, dao: HolderDAO, user_id: int
-    ) -> list[Reminder] | None:
-        try:
-            all_active_reminders = await dao.reminder.get_active_user_reminders(user_id)
-            return all_active_reminders
-        except Exception as e:
-            logger.error(f"Error getting active reminders: {e}", exc_info=True)
-            return None
-
-    async def get_disabled_user_reminders(self, dao: HolderDAO, user_id: int):
+    async def get_user_reminders_page(
+        self,
+        dao: HolderDAO,
+        user_id: int,
+        list_filter: ReminderListFilter,
+        page_size: int,
+        after: ReminderPageKey | None = None,
+        before: ReminderPageKey | None = None,
+    ) -> ReminderPage | None:
+        get_reminders = {
+            ReminderListFilter.ALL: dao.read.reminder.get_all_user_reminders,
+            ReminderListFilter.ACTIVE: dao.read.reminder.get_active_user_reminders,
+            ReminderListFilter.DISABLED: dao.read.reminder.get_disabled_user_reminders,
+        }[list_filter]
         try:
-            all_disabled_reminders = await dao.reminder.get_disabled_user_reminders(
-                user_id
+            # Лишнее напоминание сверх страницы показывает, есть ли куда листать
+            reminders = await get_reminders(
+                user_id, after=after, before=before, limit=page_size + 1
             )
-            return all_disabled_reminders
         except Exception as e:
-            logger.error(f"Error getting disabled reminders: {e}", exc_info=True)
+            logger.error(f"Error getting reminders page: {e}", exc_info=True)
             return None
+        if before is not None:
+            return ReminderPage(
+                reminders=reminders[-page_size:],
+                has_prev=len(reminders) > page_size,
+                has_next=True,
+            )
+        return ReminderPage(
+            reminders=reminders[:page_size],
+            has_prev=after is not None,
+            has_next=len(reminders) > page_size,
+        )
 
     async def disable_all_user_reminders(
         self, scheduler_service: SchedulerService, dao: HolderDAO, user_id: int
     ):
-        reminders = await dao.reminder.get_all_user_reminders(user_id)
-        await scheduler_service.pause_all_user_jobs(
-            [reminder.apscheduler_job_id for reminder in reminders]
+        updated = await dao.reminder.set_user_reminders_active(user_id, False)
+        dao.on_commit(
+            scheduler_service.pause_all_user_jobs,
+            [row.apscheduler_job_id for row in updated],
         )
-        for reminder in reminders:
-            await dao.reminder.update(reminder, {"is_active": False})
+        dao.on_commit(self._invalidate_cached_reminders, *(row.id for row in updated))
+        dao.on_commit(self._invalidate_reminder_pages, user_id)
         await dao.base.commit()
 
     async def enable_all_user_reminders(
         self, scheduler_service: SchedulerService, dao: HolderDAO, user_id: int
     ):
-        reminders = await dao.reminder.get_all_user_reminders(user_id)
-        await scheduler_service.resume_all_user_jobs(
-            [reminder.apscheduler_job_id for reminder in reminders]
+        updated = await dao.reminder.set_user_reminders_active(user_id, True)
+        dao.on_commit(
+            scheduler_service.resume_all_user_jobs,
+            [row.apscheduler_job_id for row in updated],
         )
-        for reminder in reminders:
-            await dao.reminder.update(reminder, {"is_active": True})
+        dao.on_commit(self._invalidate_cached_reminders, *(row.id for row in updated))
+        dao.on_commit(self._invalidate_reminder_pages, user_id)
         await dao.base.commit()
 
     async def delete_all_user_reminders(
         self, dao: HolderDAO, scheduler_service: SchedulerService, user_id: int
     ):
-        reminders = await dao.reminder.get_all_user_reminders(user_id)
-        await scheduler_service.remove_all_user_jobs(
-            [reminder.apscheduler_job_id for reminder in reminders]
+        deleted = await dao.reminder.delete_user_reminders(user_id)
+        dao.on_commit(
+            scheduler_service.remove_all_user_jobs,
+            [row.apscheduler_job_id for row in deleted],
         )
-        for reminder in reminders:
-            await dao.reminder.delete(reminder)
+        dao.on_commit(self._invalidate_cached_reminders, *(row.id for row in deleted))
+        dao.on_commit(self._invalidate_reminder_pages, user_id)
         await dao.base.commit()
 
     async def delete_all_active_user_reminders(
         self, dao: HolderDAO, scheduler_service: SchedulerService, user_id: int
     ):
-        reminders = await dao.reminder.get_active_user_reminders(user_id)
-        await scheduler_service.remove_all_user_jobs(
-            [reminder.apscheduler_job_id for reminder in reminders]
+        deleted = await dao.reminder.delete_user_reminders(user_id, is_active=True)
+        dao.on_commit(
+            scheduler_service.remove_all_user_jobs,
+            [row.apscheduler_job_id for row in deleted],
         )
-        for reminder in reminders:
-            await dao.reminder.delete(reminder)
+        dao.on_commit(self._invalidate_cached_reminders, *(row.id for row in deleted))
+        dao.on_commit(self._invalidate_reminder_pages, user_id)
         await dao.base.commit()
 
     async def delete_all_disabled_user_reminders(
         self, dao: HolderDAO, scheduler_service: SchedulerService, user_id: int
     ):
-        reminders = await dao.reminder.get_disabled_user_reminders(user_id)
-        await scheduler_service.remove_all_user_jobs(
-            [reminder.apscheduler_job_id for reminder in reminders]
+        deleted = await dao.reminder.delete_user_reminders(user_id, is_active=False)
+        dao.on_commit(
+            scheduler_service.remove_all_user_jobs,
+            [row.apscheduler_job_id for row in deleted],
         )
-        for reminder in reminders:
-            await dao.reminder.delete(reminder)
+        dao.on_commit(self._invalidate_cached_reminders, *(row.id for row in deleted))
+        dao.on_commit(self._invalidate_reminder_pages, user_id)
         await dao.base.commit()
 
     async def reset_reminder_start_time(
@@ -212,18 +259,19 @@ class ReminderService:
                 logger.error(
                     f"Error resetting reminder start time. Job id: {reminder.apscheduler_job_id}"
                 )
-            updated_job = await scheduler_service.get_job_by_id(
-                job_id=reminder.apscheduler_job_id
-            )
+            next_run_time = calculate_next_run_time(job_trigger_type, job_trigger_args)
             updated_reminder = await dao.reminder.update(
                 reminder,
                 {
                     "start_datetime": start_datetime,
-                    "next_run_time": updated_job.next_run_time,
+                    "next_run_time": next_run_time,
                 },
             )
             if not updated_reminder:
                 logger.error(f"Error updating reminder. Reminder id: {reminder_id}")
+            if self.next_run_time_writer is not None:
+                dao.on_commit(self.next_run_time_writer.discard, reminder_id)
+            dao.on_commit(self._invalidate_reminder_pages, reminder.user_id)
             await dao.base.commit()
             return updated_reminder
         except Exception as e:
@@ -0,0 +1,69 @@
+import dataclasses
+import json
+import logging
+
+from aiogram.fsm.storage.redis import Redis
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database.dao.reminder import ReminderDAO
+from src.dto.reminder import ReminderPayloadDTO
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderLookup:
+    """Данные напоминания для сработавшей задачи: Redis-кэш, общий для реплик, и БД при промахе.
+
+    Текст, получатель и статус меняются только через ReminderService, который
+    после коммита вызывает invalidate, поэтому по умолчанию запись живёт до
+    инвалидации: TTL короче периода напоминания означал бы промах почти на
+    каждом срабатывании.
+    """
+
+    key_prefix = "reminder_payload"
+
+    def __init__(
+        self,
+        pool: async_sessionmaker[AsyncSession],
+        redis: Redis,
+        ttl: int | None = None,
+    ):
+        self.pool = pool
+        self.redis = redis
+        self.ttl = ttl
+
+    def _key(self, reminder_id: int) -> str:
+        return f"{self.key_prefix}:{reminder_id}"
+
+    async def get(self, reminder_id: int) -> ReminderPayloadDTO | None:
+        try:
+            cached = await self.redis.get(self._key(reminder_id))
+            if cached is not None:
+                return ReminderPayloadDTO(**json.loads(cached))
+        except Exception as e:
+            logger.warning(f"Reminder cache read failed for {reminder_id}: {e}")
+
+        async with self.pool() as session:
+            payload = await ReminderDAO(session).get_payload(reminder_id)
+        if payload is None:
+            return None
+
+        try:
+            await self.redis.set(
+                self._key(reminder_id),
+                json.dumps(dataclasses.asdict(payload), ensure_ascii=False),
+                ex=self.ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Reminder cache write failed for {reminder_id}: {e}")
+        return payload
+
+    async def invalidate(self, *reminder_ids: int) -> None:
+        if not reminder_ids:
+            return
+        try:
+            await self.redis.delete(
+                *(self._key(reminder_id) for reminder_id in reminder_ids)
+            )
+        except Exception as e:
+            logger.error(f"Reminder cache invalidation failed: {e}", exc_info=True)
@@ -0,0 +1,115 @@
+import datetime
+import json
+import logging
+
+from aiogram.fsm.storage.redis import Redis
+from aiogram.types import InlineKeyboardMarkup
+
+from src.database.models.reminder import Reminder
+from src.enums.reminder import ReminderListFilter
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderPageCache:
+    """Отрисованные страницы списков напоминаний (текст и клавиатура) в Redis.
+
+    Ключ страницы включает номер версии пользователя; любое изменение его
+    напоминаний через ReminderService увеличивает версию, и старые страницы
+    просто перестают читаться, пока не истечёт их TTL. Страница с временем
+    следующего срабатывания живёт не дольше этого времени: после
+    срабатывания в ней было бы устаревшее время.
+    """
+
+    key_prefix = "reminder_page"
+    version_key_prefix = "reminder_page_version"
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl: int = 10 * 60,
+        version_ttl: int = 24 * 60 * 60,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        # Версия должна жить дольше страниц, иначе сброс к 0 оживит старые
+        self.version_ttl = max(version_ttl, ttl)
+
+    def _version_key(self, user_id: int) -> str:
+        return f"{self.version_key_prefix}:{user_id}"
+
+    def _key(
+        self, user_id: int, version: int, list_filter: ReminderListFilter, cursor: str
+    ) -> str:
+        return f"{self.key_prefix}:{user_id}:{version}:{list_filter.value}:{cursor}"
+
+    async def get(
+        self, user_id: int, list_filter: ReminderListFilter, cursor: str
+    ) -> tuple[int, tuple[str, InlineKeyboardMarkup] | None]:
+        """Текущая версия пользователя и страница из кэша, если она есть.
+
+        Версию нужно передать в put: страница, собранная во время изменения,
+        запишется под старой версией и читаться уже не будет.
+        """
+        try:
+            version = int(await self.redis.get(self._version_key(user_id)) or 0)
+            cached = await self.redis.get(
+                self._key(user_id, version, list_filter, cursor)
+            )
+        except Exception as e:
+            logger.warning(f"Reminder page cache read failed for {user_id}: {e}")
+            return 0, None
+        if cached is None:
+            return version, None
+        page = json.loads(cached)
+        return version, (
+            page["text"],
+            InlineKeyboardMarkup.model_validate_json(page["markup"]),
+        )
+
+    async def put(
+        self,
+        user_id: int,
+        version: int,
+        list_filter: ReminderListFilter,
+        cursor: str,
+        text: str,
+        markup: InlineKeyboardMarkup,
+        reminders: list[Reminder],
+    ) -> None:
+        ttl = self.ttl
+        next_run_times = [
+            reminder.next_run_time
+            for reminder in reminders
+            if reminder.is_active and reminder.next_run_time is not None
+        ]
+        if next_run_times:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            ttl = min(ttl, int((min(next_run_times) - now).total_seconds()))
+            if ttl <= 0:
+                return
+        page = {
+            "text": text,
+            "markup": markup.model_dump_json(exclude_none=True),
+        }
+        try:
+            await self.redis.set(
+                self._key(user_id, version, list_filter, cursor),
+                json.dumps(page, ensure_ascii=False),
+                ex=ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Reminder page cache write failed for {user_id}: {e}")
+
+    async def invalidate(self, *user_ids: int) -> None:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.incr(self._version_key(user_id))
+                    pipe.expire(self._version_key(user_id), self.version_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(
+                f"Reminder page cache invalidation failed for {user_ids}: {e}",
+                exc_info=True,
+            )
@@ -1,10 +1,13 @@
+import asyncio
 import datetime
 import logging
 import uuid
 from typing import List, Optional
 
+from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.job import Job
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_RUNNING
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
@@ -14,31 +17,69 @@ from src.database.models.reminder import Reminder
 from src.keyboards.reminder_management import ReminderManagementKeyboards
 from aiogram.types import InlineKeyboardMarkup
 
+from src.services.metrics import REMINDER_FIRE_LAG
 from src.text.formatters.reminder_management import format_text_and_next_run_time
+from src.utils.datetime_utils import build_trigger
 
 logger = logging.getLogger(__name__)
 
 
-# --- Функция задачи ---
-async def send_reminder_job(tg_user_id: int, reminder_id: int, reminder_status: bool, message_text: str, job_id: str):
+def render_reminder_message(
+    reminder_id: int,
+    message_text: str,
+    reminder_status: bool,
+    next_run_time: datetime.datetime | None,
+) -> tuple[str, InlineKeyboardMarkup]:
+    keyboard = ReminderManagementKeyboards.get_reminder_management_keyboard_by_status(
+        reminder_id, reminder_status
+    )
+    formatted_text = format_text_and_next_run_time(
+        message_text, next_run_time, reminder_status
+    )
+    return formatted_text, keyboard
+
+
+# Номер формата kwargs задачи в jobstore (1 - только ссылка на напоминание),
+# общий для всех задач; меняется только вместе со структурой kwargs
+REMINDER_JOB_PAYLOAD_FORMAT = 1
 
-    bot = AppContext.get_bot()
-    scheduler = AppContext.get_scheduler()
-    job = scheduler.get_job(job_id)
-    next_run_time = job.next_run_time
 
+# --- Функция задачи ---
+async def send_reminder_job(
+    reminder_id: int,
+    payload_format: int = REMINDER_JOB_PAYLOAD_FORMAT,
+    next_run_time: Optional[datetime.datetime] = None,
+    **legacy_kwargs,
+):
+    # next_run_time подставляет ReminderExecutor, чтобы не читать задачу из jobstore.
+    # Текст и статус берутся в момент срабатывания; legacy_kwargs - поля задач,
+    # созданных до перехода на компактный формат (и прежний ключ "version"
+    # вместо payload_format), они больше не используются.
     try:
+        reminder = await AppContext.get_reminder_lookup().get(reminder_id)
+        if reminder is None:
+            logger.warning(f"Reminder {reminder_id} not found, skipping job run")
+            return
+        if not reminder.is_active:
+            logger.info(f"Reminder {reminder_id} is disabled, skipping job run")
+            return
+
         logger.info(
-            f"Sending reminder job for reminder_id={reminder_id} for user_id={tg_user_id}"
+            f"Sending reminder job for reminder_id={reminder_id} for user_id={reminder.tg_user_id}"
         )
-        keyboard = ReminderManagementKeyboards.get_reminder_management_keyboard_by_status(
-            reminder_id, reminder_status
-        )
-        formatted_text = format_text_and_next_run_time(message_text, next_run_time, reminder_status)
-        await bot.send_message(chat_id=tg_user_id, text=formatted_text, reply_markup=keyboard)
-        logger.info(
-            f"Reminder sent successfully for user_id={tg_user_id} reminder_id={reminder_id}"
+        next_run_time_writer = AppContext.get_next_run_time_writer()
+        if next_run_time_writer is not None:
+            next_run_time_writer.record(reminder_id, next_run_time)
+
+        formatted_text, keyboard = render_reminder_message(
+            reminder_id, reminder.text, reminder.is_active, next_run_time
         )
+        if AppContext.get_delivery_queue().enqueue(
+            reminder.tg_user_id, formatted_text, keyboard
+        ):
+            logger.info(
+                f"Reminder queued for delivery for user_id={reminder.tg_user_id} reminder_id={reminder_id}"
+            )
     except Exception as e:
         logger.error(
             f"Error sending reminder job for reminder_id={reminder_id}: {e}",
@@ -46,6 +87,33 @@ async def send_reminder_job(tg_user_id: int, reminder_id: int, reminder_status:
         )
 
 
+class _FiredJob:
+    """Задача с next_run_time, добавленным в kwargs на время одного запуска."""
+
+    def __init__(self, job: Job, next_run_time: Optional[datetime.datetime]):
+        self._job = job
+        self.kwargs = {**job.kwargs, "next_run_time": next_run_time}
+
+    def __getattr__(self, name):
+        return getattr(self._job, name)
+
+    def __str__(self):
+        return str(self._job)
+
+
+class ReminderExecutor(AsyncIOExecutor):
+    def _do_submit_job(self, job: Job, run_times: list[datetime.datetime]):
+        if job.func is send_reminder_job:
+            # Тот же расчёт планировщик выполнит сразу после отправки задачи
+            now = datetime.datetime.now(self._scheduler.timezone)
+            REMINDER_FIRE_LAG.labels(engine="apscheduler").observe(
+                (now - run_times[-1]).total_seconds()
+            )
+            next_run_time = job.trigger.get_next_fire_time(run_times[-1], now)
+            job = _FiredJob(job, next_run_time)
+        super()._do_submit_job(job, run_times)
+
+
 class SchedulerService:
     def __init__(self, scheduler: AsyncIOScheduler):
         self.scheduler = scheduler
@@ -58,20 +126,14 @@ class SchedulerService:
         try:
             job = self.scheduler.add_job(
                 func=send_reminder_job,
-                trigger=trigger_type,
-                timezone="Europe/Moscow",
+                trigger=build_trigger(trigger_type, trigger_args),
                 id=job_id,
                 name=f"Reminder {reminder.id}",
                 replace_existing=True,
                 kwargs={
-                    "tg_user_id": tg_user_id,
                     "reminder_id": reminder.id,
-                    "reminder_status": reminder.is_active,
-                    "message_text": reminder.text,
-                    "job_id": job_id,
-                    "reminder_status": reminder.is_active
+                    "payload_format": REMINDER_JOB_PAYLOAD_FORMAT,
                 },
-                **trigger_args,
                 misfire_grace_time=60 * 5,
             )
             logger.info(
@@ -122,56 +184,61 @@ class SchedulerService:
             logger.error(f"Error resuming job {job_id}: {e}", exc_info=True)
             return False
 
-    async def pause_all_user_jobs(self, job_ids: List[str]) -> bool:
-        logger.info("Attempting to pause all jobs in the scheduler.")
-        try:
-            for job_id in job_ids:
-                try:
-                    await self.pause_job(job_id)
-                except LookupError:
-                    logger.warning(
-                        f"Job {job_id} was not found during pause iteration (might have been removed concurrently)."
-                    )
-                    failed_count += 1
-        except Exception as e:
-            logger.error(
-                f"No ids in the list of jobs to pause: {job_ids}. Error pausing jobs: {e}",
-                exc_info=True,
-            )
+    def _get_batch_jobstore(self):
+        jobstore = self.scheduler._lookup_jobstore("default")
+        return jobstore if hasattr(jobstore, "pause_jobs") else None
 
-    async def resume_all_user_jobs(self, job_ids: List[str]) -> bool:
-        logger.info("Attempting to pause all jobs in the scheduler.")
+    async def _run_batch(
+        self, action: str, job_ids: List[str], batch_call, single_call
+    ) -> dict[str, bool]:
+        job_ids = [job_id for job_id in job_ids if job_id]
+        if not job_ids:
+            return {}
+        jobstore = self._get_batch_jobstore()
         try:
-            for job_id in job_ids:
-                try:
-                    await self.resume_job(job_id)
-                except LookupError:
-                    logger.warning(
-                        f"Job {job_id} was not found during pause iteration (might have been removed concurrently)."
-                    )
-                    failed_count += 1
+            if jobstore is not None:
+                # Синхронный клиент Redis: обращения не должны стоять в цикле событий
+                results = await asyncio.to_thread(batch_call, jobstore, job_ids)
+            else:
+                results = {job_id: await single_call(job_id) for job_id in job_ids}
         except Exception as e:
-            logger.error(
-                f"No ids in the list of jobs to pause: {job_ids}. Error pausing jobs: {e}",
-                exc_info=True,
-            )
+            logger.error(f"Error trying to {action} jobs {job_ids}: {e}", exc_info=True)
+            return {job_id: False for job_id in job_ids}
 
-    async def remove_all_user_jobs(self, job_ids: List[str]) -> bool:
-        logger.info("Attempting to pause all jobs in the scheduler.")
-        try:
-            for job_id in job_ids:
-                try:
-                    await self.remove_job(job_id)
-                except LookupError:
-                    logger.warning(
-                        f"Job {job_id} was not found during pause iteration (might have been removed concurrently)."
-                    )
-                    failed_count += 1
-        except Exception as e:
-            logger.error(
-                f"No ids in the list of jobs to pause: {job_ids}. Error pausing jobs: {e}",
-                exc_info=True,
-            )
+        failed = [job_id for job_id, ok in results.items() if not ok]
+        if failed:
+            logger.warning(f"Failed to {action} {len(failed)} job(s): {failed}")
+        logger.info(f"Tried to {action} {len(job_ids)} job(s), {len(failed)} failed.")
+        return results
+
+    async def pause_all_user_jobs(self, job_ids: List[str]) -> dict[str, bool]:
+        return await self._run_batch(
+            "pause",
+            job_ids,
+            lambda jobstore, ids: jobstore.pause_jobs(ids),
+            self.pause_job,
+        )
+
+    async def resume_all_user_jobs(self, job_ids: List[str]) -> dict[str, bool]:
+        now = datetime.datetime.now(self.scheduler.timezone)
+        results = await self._run_batch(
+            "resume",
+            job_ids,
+            lambda jobstore, ids: jobstore.resume_jobs(ids, now),
+            self.resume_job,
+        )
+        # Планировщик должен пересчитать время ближайшего пробуждения
+        if any(results.values()) and self.scheduler.state == STATE_RUNNING:
+            self.scheduler.wakeup()
+        return results
+
+    async def remove_all_user_jobs(self, job_ids: List[str]) -> dict[str, bool]:
+        return await self._run_batch(
+            "remove",
+            job_ids,
+            lambda jobstore, ids: jobstore.remove_jobs(ids),
+            self.remove_job,
+        )
 
     async def get_job_by_id(self, job_id: str) -> Job:
         try:
@@ -203,7 +270,9 @@ class SchedulerService:
             logger.warning(f"Задача с ID '{job_id}' не найдена.")
             return False
         try:
-            self.scheduler.reschedule_job(job_id, trigger=trigger_type, **trigger_args)
+            self.scheduler.reschedule_job(
+                job_id, trigger=build_trigger(trigger_type, trigger_args)
+            )
         except Exception as e:
             logger.error(f"Error rescheduling job {job_id}: {e}", exc_info=True)
             return False
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Optional
+
+from aiogram.fsm.storage.redis import Redis
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING
+
+from src.config.main_config import SchedulerConfig
+from src.services.catchup import ReminderCatchUp
+
+logger = logging.getLogger(__name__)
+
+# Продлеваем/освобождаем аренду только если ею всё ещё владеет эта реплика
+_RENEW_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class SchedulerLeaderElector:
+    """Выбор лидера через Redis: задачи из общего jobstore исполняет только одна реплика.
+
+    Остальные реплики держат планировщик на паузе, но продолжают добавлять и
+    изменять задачи в общем jobstore. Если лидер перестаёт продлевать аренду,
+    по истечении TTL её захватывает другая реплика.
+    """
+
+    def __init__(
+        self,
+        scheduler: AsyncIOScheduler,
+        redis: Redis,
+        config: SchedulerConfig,
+        catch_up: Optional[ReminderCatchUp] = None,
+    ):
+        self.scheduler = scheduler
+        self.catch_up = catch_up
+        self.redis = redis
+        self.lease_key = config.lease_key
+        self.lease_ttl_ms = config.lease_ttl * 1000
+        self.heartbeat_interval = config.heartbeat_interval
+        self.replica_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="scheduler-leader")
+            logger.info(f"Scheduler leader election started as {self.replica_id}.")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.catch_up is not None:
+            await self.catch_up.stop()
+        await self._step_down()
+        try:
+            await self.redis.eval(_RELEASE_SCRIPT, 1, self.lease_key, self.replica_id)
+        except Exception as e:
+            logger.error(f"Error releasing scheduler lease: {e}", exc_info=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Без связи с Redis нельзя гарантировать единственного лидера
+                logger.error(f"Scheduler lease heartbeat failed: {e}", exc_info=True)
+                await self._step_down()
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _heartbeat(self) -> None:
+        if self.is_leader:
+            renewed = await self.redis.eval(
+                _RENEW_SCRIPT, 1, self.lease_key, self.replica_id, self.lease_ttl_ms
+            )
+            if not renewed:
+                logger.warning(f"Scheduler lease lost by {self.replica_id}.")
+                await self._step_down()
+                return
+        else:
+            acquired = await self.redis.set(
+                self.lease_key, self.replica_id, nx=True, px=self.lease_ttl_ms
+            )
+            if not acquired:
+                return
+            await self._take_over()
+
+        # Задачи, добавленные другими репликами, лидер увидит при следующем пробуждении
+        self.scheduler.wakeup()
+
+    async def _take_over(self) -> None:
+        self.is_leader = True
+        if self.catch_up is not None:
+            # Пропущенное за время без лидера досылается до возобновления планировщика
+            try:
+                await self.catch_up.run()
+            except Exception as e:
+                logger.error(f"Scheduler catch-up failed: {e}", exc_info=True)
+        if self.scheduler.state == STATE_PAUSED:
+            self.scheduler.resume()
+        logger.info(f"Replica {self.replica_id} became scheduler leader.")
+
+    async def _step_down(self) -> None:
+        if self.is_leader:
+            logger.info(f"Replica {self.replica_id} stepped down as scheduler leader.")
+        self.is_leader = False
+        if self.scheduler.state == STATE_RUNNING:
+            self.scheduler.pause()
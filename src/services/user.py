@@ -1,8 +1,27 @@
 from src import dto
 from src.database.dao.user import UserDAO
+from src.services.user_cache import UserIdentityCache
+from src.services.user_upsert_batcher import UserUpsertBatcher
 
 
 async def upsert_user(user: dto.User, user_dao: UserDAO) -> dto.User:
     saved_user = await user_dao.upsert_user(user)
     await user_dao.commit()
     return saved_user
+
+
+async def get_or_upsert_user(
+    user: dto.User,
+    user_dao: UserDAO,
+    user_cache: UserIdentityCache,
+    upsert_batcher: UserUpsertBatcher | None = None,
+) -> dto.User:
+    cached_user = user_cache.get(user)
+    if cached_user is not None:
+        return cached_user
+    if upsert_batcher is not None:
+        saved_user = await upsert_batcher.upsert(user)
+    else:
+        saved_user = await upsert_user(user, user_dao)
+    user_cache.put(saved_user)
+    return saved_user
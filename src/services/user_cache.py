@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src import dto
+
+
+class UserIdentityCache:
+    """LRU-кэш dto.User по tg_id с TTL.
+
+    Запись действительна, пока не истёк TTL и не изменился отпечаток полей
+    профиля из Telegram, поэтому upsert в БД нужен только новым
+    пользователям и тем, кто сменил имя, username или язык.
+    """
+
+    def __init__(self, ttl: float = 5 * 60, max_size: int = 10_000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[int, tuple[tuple, float, dto.User]] = OrderedDict()
+
+    @staticmethod
+    def fingerprint(user: dto.User) -> tuple:
+        return (
+            user.first_name,
+            user.last_name,
+            user.username,
+            user.is_bot,
+            user.language_code,
+        )
+
+    def get(self, user: dto.User) -> Optional[dto.User]:
+        entry = self._entries.get(user.tg_id)
+        if entry is None:
+            return None
+        fingerprint, expires_at, saved_user = entry
+        if expires_at < time.monotonic() or fingerprint != self.fingerprint(user):
+            del self._entries[user.tg_id]
+            return None
+        self._entries.move_to_end(user.tg_id)
+        return saved_user
+
+    def put(self, saved_user: dto.User) -> None:
+        self._entries[saved_user.tg_id] = (
+            self.fingerprint(saved_user),
+            time.monotonic() + self.ttl,
+            saved_user,
+        )
+        self._entries.move_to_end(saved_user.tg_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tg_id: int) -> None:
+        self._entries.pop(tg_id, None)
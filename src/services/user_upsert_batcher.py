@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src import dto
+from src.database.dao.user import UserDAO
+
+logger = logging.getLogger(__name__)
+
+
+class UserUpsertBatcher:
+    """Объединяет upsert пользователей из параллельных апдейтов в один запрос.
+
+    Первый upsert в пачке запускает таймер на max_delay секунд; всё, что
+    пришло за это время, пишется одним INSERT ... ON CONFLICT DO UPDATE
+    ... RETURNING и одним commit, после чего каждый ожидающий получает свой
+    dto.User. Повторы одного tg_id внутри пачки сливаются, побеждает
+    последний профиль.
+    """
+
+    def __init__(
+        self,
+        pool: async_sessionmaker[AsyncSession],
+        max_delay: float = 0.005,
+        max_batch: int = 500,
+    ):
+        self.pool = pool
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._pending: dict[int, tuple[dto.User, list[asyncio.Future]]] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._writes: set[asyncio.Task] = set()
+
+    async def upsert(self, user: dto.User) -> dto.User:
+        future = asyncio.get_running_loop().create_future()
+        _, waiters = self._pending.get(user.tg_id, (user, []))
+        waiters.append(future)
+        self._pending[user.tg_id] = (user, waiters)
+        if len(self._pending) >= self.max_batch:
+            # Заполненная пачка пишется сразу, таймер подберёт следующую
+            self._spawn_write(self._take_pending())
+        elif self._timer is None:
+            self._timer = asyncio.create_task(
+                self._write_after_delay(), name="user-upsert-timer"
+            )
+        return await future
+
+    def _take_pending(self) -> dict[int, tuple[dto.User, list[asyncio.Future]]]:
+        batch, self._pending = self._pending, {}
+        return batch
+
+    def _spawn_write(
+        self, batch: dict[int, tuple[dto.User, list[asyncio.Future]]]
+    ) -> None:
+        task = asyncio.create_task(self._write(batch), name="user-upsert-write")
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def stop(self) -> None:
+        """Дописывает накопленную пачку и дожидается начатых записей."""
+        if self._timer is not None:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+        batch = self._take_pending()
+        if batch:
+            self._spawn_write(batch)
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    async def _write_after_delay(self) -> None:
+        await asyncio.sleep(self.max_delay)
+        self._timer = None
+        batch = self._take_pending()
+        if batch:
+            # Запись отдельной задачей, чтобы stop() её дождался, а не отменил
+            self._spawn_write(batch)
+
+    async def _write(
+        self, batch: dict[int, tuple[dto.User, list[asyncio.Future]]]
+    ) -> None:
+        try:
+            async with self.pool() as session:
+                saved_users = await UserDAO(session).upsert_users(
+                    [user for user, _ in batch.values()]
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to upsert {len(batch)} users: {e}", exc_info=True)
+            self._fail_waiters(batch, e)
+            return
+
+        for saved_user in saved_users:
+            _, waiters = batch.get(saved_user.tg_id, (None, []))
+            for future in waiters:
+                # Апдейт мог быть отменён, пока пачка писалась
+                if not future.done():
+                    future.set_result(saved_user)
+        # Без строки в RETURNING ожидающий иначе ждал бы вечно
+        self._fail_waiters(
+            batch, RuntimeError("User upsert returned no row for this tg_id")
+        )
+
+    @staticmethod
+    def _fail_waiters(
+        batch: dict[int, tuple[dto.User, list[asyncio.Future]]], error: Exception
+    ) -> None:
+        for _, waiters in batch.values():
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(error)
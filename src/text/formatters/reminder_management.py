@@ -50,3 +50,28 @@ def format_text_and_next_run_time(text, next_run_time, reminder_status):
         f"Следующее срабатывание: {next_run_time}",
     )
     return "\n".join(formatted_text)
+
+
+def format_reminders_page(title: str, reminders: list[Reminder]) -> str:
+    lines = [f"{title}:\n"]
+    for number, reminder in enumerate(reminders, start=1):
+        if not reminder.is_active:
+            status = "напоминание отключено"
+        elif reminder.next_run_time is None:
+            status = "время срабатывания ещё не рассчитано"
+        else:
+            status = convert_dt_to_russian(
+                reminder.next_run_time.astimezone(ZoneInfo("Europe/Moscow"))
+            )
+        lines.append(f"{number}. {reminder.text}\n    {status}")
+    return "\n".join(lines)
+
+
+def format_missed_reminders_summary(missed: list[tuple[str, int]], limit: int = 10):
+    total = sum(count for _, count in missed)
+    lines = [f"Пока бот был недоступен, пропущено напоминаний: {total}\n"]
+    for text, count in missed[:limit]:
+        lines.append(f"• {text}" if count == 1 else f"• {text} (×{count})")
+    if len(missed) > limit:
+        lines.append(f"…и ещё {len(missed) - limit}")
+    return "\n".join(lines)
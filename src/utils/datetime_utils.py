@@ -1,7 +1,11 @@
 import re
 from datetime import date, datetime, time, timedelta
 from typing import Any, Dict, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
 
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from dateutil.relativedelta import relativedelta
 
 
@@ -203,3 +207,42 @@ def create_trigger_args(
         return "interval", {"start_date": start_datetime, "seconds": total_seconds}
     else:
         raise ValueError(f"Неподдерживаемый тип частоты: {frequency_type}")
+
+
+class CompactCronTrigger(CronTrigger):
+    # В jobstore сохраняются только аргументы конструктора, а не разобранные поля
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._init_kwargs = kwargs
+
+    def __getstate__(self):
+        return {"version": 1, "kwargs": self._init_kwargs}
+
+    def __setstate__(self, state):
+        self.__init__(**state["kwargs"])
+
+
+def build_trigger(
+    trigger_type: str,
+    trigger_args: Dict[str, Any],
+    timezone: str = "Europe/Moscow",
+) -> BaseTrigger:
+    if trigger_type == "cron":
+        return CompactCronTrigger(timezone=timezone, **trigger_args)
+    elif trigger_type == "interval":
+        return IntervalTrigger(timezone=timezone, **trigger_args)
+    else:
+        raise ValueError(f"Неподдерживаемый тип триггера: {trigger_type}")
+
+
+def calculate_next_run_time(
+    trigger_type: str,
+    trigger_args: Dict[str, Any],
+    now: Optional[datetime] = None,
+    timezone: str = "Europe/Moscow",
+) -> Optional[datetime]:
+    # Совпадает с next_run_time, который APScheduler назначил бы новой задаче
+    trigger = build_trigger(trigger_type, trigger_args, timezone)
+    if now is None:
+        now = datetime.now(ZoneInfo(timezone))
+    return trigger.get_next_fire_time(None, now)
@@ -0,0 +1,49 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.services import delivery
+from src.services.delivery import TokenBucket
+
+
+class Clock:
+    """Подменяет часы и sleep модуля delivery: ожидание только двигает время."""
+
+    def __init__(self, monkeypatch):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+        monkeypatch.setattr(delivery, "time", SimpleNamespace(monotonic=self.monotonic))
+        monkeypatch.setattr(delivery, "asyncio", SimpleNamespace(sleep=self.sleep))
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+async def acquire(bucket: TokenBucket, count: int) -> None:
+    for _ in range(count):
+        await bucket.acquire()
+
+
+def test_token_bucket_allows_burst_then_waits_for_rate(monkeypatch):
+    clock = Clock(monkeypatch)
+    bucket = TokenBucket(rate=8, capacity=2)
+
+    asyncio.run(acquire(bucket, 2))
+    assert clock.sleeps == []
+
+    asyncio.run(acquire(bucket, 3))
+    assert clock.sleeps == [1 / 8] * 3
+    assert clock.now == 3 / 8
+
+
+def test_token_bucket_refill_is_capped(monkeypatch):
+    clock = Clock(monkeypatch)
+    bucket = TokenBucket(rate=8, capacity=2)
+
+    asyncio.run(acquire(bucket, 2))
+    clock.now += 60
+    asyncio.run(acquire(bucket, 3))
+    assert clock.sleeps == [1 / 8]
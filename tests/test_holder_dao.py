@@ -0,0 +1,207 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from src.database.dao.holder import HolderDAO
+from src.middlewares.database import ReleaseConnectionRequestMiddleware, _current_dao
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Item(_Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+class Database:
+    """SQLite-база в файле и счётчик COMMIT на уровне соединений."""
+
+    def __init__(self, path):
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        self.pool = async_sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+        )
+        self.commits = 0
+        self.rollbacks = 0
+        event.listen(self.engine.sync_engine, "commit", self._count_commit)
+        event.listen(self.engine.sync_engine, "rollback", self._count_rollback)
+
+    def _count_commit(self, connection) -> None:
+        self.commits += 1
+
+    def _count_rollback(self, connection) -> None:
+        self.rollbacks += 1
+
+    async def create(self) -> None:
+        async with self.engine.begin() as connection:
+            await connection.run_sync(_Base.metadata.create_all)
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def names(self) -> list[str]:
+        async with self.pool() as session:
+            return list(await session.scalars(select(Item.name).order_by(Item.id)))
+
+
+@pytest.fixture
+def run_with_db(tmp_path):
+    def run(scenario):
+        async def main():
+            db = Database(tmp_path / "test.db")
+            try:
+                await db.create()
+                await scenario(db)
+            finally:
+                await db.engine.dispose()
+
+        asyncio.run(main())
+
+    return run
+
+
+async def telegram_call(dao: HolderDAO, log: list) -> None:
+    # Запрос к Bot API проходит через request-middleware сессии бота
+    async def make_request(bot, method):
+        log.append("telegram")
+
+    token = _current_dao.set(dao)
+    try:
+        await ReleaseConnectionRequestMiddleware()(make_request, None, None)
+    finally:
+        _current_dao.reset(token)
+
+
+def test_release_commits_read_only_transaction(run_with_db):
+    async def scenario(db: Database):
+        dao = HolderDAO(db.pool)
+        await dao.session.scalars(select(Item))
+        assert dao.session.in_transaction()
+
+        await telegram_call(dao, [])
+
+        assert not dao.session.in_transaction()
+        assert db.commits == 1
+        await dao.close()
+
+    run_with_db(scenario)
+
+
+def test_release_keeps_write_transaction_open(run_with_db):
+    async def scenario(db: Database):
+        dao = HolderDAO(db.pool)
+        dao.session.add(Item(name="a"))
+        await dao.session.flush()
+
+        await telegram_call(dao, [])
+
+        assert dao.session.in_transaction()
+        assert db.commits == 0
+        await dao.base.commit()
+        assert db.commits == 1
+        assert await db.names() == ["a"]
+        await dao.close()
+
+    run_with_db(scenario)
+
+
+def test_release_keeps_pending_objects(run_with_db):
+    async def scenario(db: Database):
+        dao = HolderDAO(db.pool)
+        await dao.session.scalars(select(Item))
+        dao.session.add(Item(name="a"))
+
+        await dao.release_connection()
+
+        assert dao.session.in_transaction()
+        assert db.commits == 0
+        await dao.close()
+
+    run_with_db(scenario)
+
+
+def test_unit_of_work_commits_once_after_telegram_call(run_with_db):
+    async def scenario(db: Database):
+        log = []
+        dao = HolderDAO(db.pool, unit_of_work=True)
+        dao.session.add(Item(name="a"))
+        dao.on_commit(log.append, "first")
+        await dao.base.commit()
+        dao.session.add(Item(name="b"))
+        dao.on_commit(log.append, "second")
+        await dao.base.commit()
+
+        await telegram_call(dao, log)
+
+        assert db.commits == 0
+        assert log == ["telegram"]
+        assert await db.names() == []
+
+        await dao.finish()
+
+        assert db.commits == 1
+        assert log == ["telegram", "first", "second"]
+        assert await db.names() == ["a", "b"]
+        await dao.close()
+
+    run_with_db(scenario)
+
+
+def test_unit_of_work_failure_rolls_back_and_drops_callbacks(run_with_db):
+    async def scenario(db: Database):
+        log = []
+        dao = HolderDAO(db.pool, unit_of_work=True)
+        dao.session.add(Item(name="a"))
+        dao.on_commit(log.append, "side effect")
+        await dao.base.commit()
+
+        await dao.finish(failed=True)
+
+        assert db.commits == 0
+        assert db.rollbacks == 1
+        assert log == []
+        assert await db.names() == []
+        await dao.close()
+
+    run_with_db(scenario)
+
+
+def test_holder_commit_runs_callbacks_after_commit(run_with_db):
+    async def scenario(db: Database):
+        log = []
+        dao = HolderDAO(db.pool)
+        dao.session.add(Item(name="a"))
+
+        async def side_effect():
+            log.append(await db.names())
+
+        dao.on_commit(side_effect)
+        await dao.base.commit()
+
+        assert log == [["a"]]
+        await dao.close()
+
+    run_with_db(scenario)
+
+
+def test_read_stays_on_primary_with_uncommitted_writes(run_with_db):
+    async def scenario(db: Database):
+        dao = HolderDAO(db.pool, replica_pool=db.pool, unit_of_work=True)
+        assert dao.read is not dao
+
+        dao.session.add(Item(name="a"))
+        assert dao.read is dao
+        await dao.base.commit()
+        assert dao.read is dao
+
+        await dao.finish()
+        assert dao.read is not dao
+        await dao.close()
+
+    run_with_db(scenario)
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
+import pytest
+from apscheduler.schedulers.background import BackgroundScheduler
+from redis import ConnectionPool
+
+from src.services.jobstores import BatchRedisJobStore, HybridJobStore
+from src.services.scheduler import send_reminder_job
+
+
+@pytest.fixture
+def redis_pool():
+    return ConnectionPool(
+        connection_class=fakeredis.FakeRedisConnection, server=fakeredis.FakeServer()
+    )
+
+
+@pytest.fixture
+def start_scheduler():
+    schedulers = []
+
+    def start(jobstore) -> BackgroundScheduler:
+        scheduler = BackgroundScheduler(jobstores={"default": jobstore}, timezone="UTC")
+        # На паузе задачи только пишутся в jobstore и не исполняются
+        scheduler.start(paused=True)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield start
+    for scheduler in schedulers:
+        scheduler.shutdown(wait=False)
+
+
+def add_jobs(scheduler: BackgroundScheduler, count: int) -> None:
+    start = datetime.now(timezone.utc) + timedelta(hours=1)
+    for index in range(count):
+        scheduler.add_job(
+            send_reminder_job,
+            "interval",
+            hours=24,
+            start_date=start + timedelta(minutes=index),
+            id=f"job-{index}",
+            kwargs={"reminder_id": index},
+        )
+
+
+def job_states(scheduler: BackgroundScheduler) -> dict[str, datetime | None]:
+    return {job.id: job.next_run_time for job in scheduler.get_jobs()}
+
+
+def test_hybrid_jobstore_replays_log_after_restart(redis_pool, start_scheduler):
+    jobstore = HybridJobStore(connection_pool=redis_pool, min_snapshot_ops=1000)
+    scheduler = start_scheduler(jobstore)
+    add_jobs(scheduler, 4)
+    scheduler.remove_job("job-0")
+    assert jobstore.pause_jobs(["job-1", "missing"]) == {
+        "job-1": True,
+        "missing": False,
+    }
+    expected = job_states(scheduler)
+
+    restarted = HybridJobStore(connection_pool=redis_pool, min_snapshot_ops=1000)
+    restarted_scheduler = start_scheduler(restarted)
+
+    assert job_states(restarted_scheduler) == expected
+    assert expected["job-1"] is None
+    assert restarted.redis.exists(restarted.snapshot_key) == 0
+
+
+def test_hybrid_jobstore_snapshot_trims_log(redis_pool, start_scheduler):
+    jobstore = HybridJobStore(connection_pool=redis_pool, min_snapshot_ops=3)
+    scheduler = start_scheduler(jobstore)
+    add_jobs(scheduler, 3)
+    jobstore._snapshot_thread.join()
+    scheduler.add_job(
+        send_reminder_job,
+        "interval",
+        hours=24,
+        id="job-3",
+        kwargs={"reminder_id": 3},
+    )
+    expected = job_states(scheduler)
+
+    assert jobstore.redis.hlen(jobstore.snapshot_key) == 3
+    assert jobstore.redis.llen(jobstore.log_key) == 1
+    restarted = HybridJobStore(connection_pool=redis_pool, min_snapshot_ops=3)
+    restarted_scheduler = start_scheduler(restarted)
+    assert job_states(restarted_scheduler) == expected
+    assert len(expected) == 4
+
+
+def test_hybrid_jobstore_migrates_legacy_hash(redis_pool, start_scheduler):
+    legacy_scheduler = start_scheduler(BatchRedisJobStore(connection_pool=redis_pool))
+    add_jobs(legacy_scheduler, 2)
+    expected = job_states(legacy_scheduler)
+
+    jobstore = HybridJobStore(connection_pool=redis_pool)
+    scheduler = start_scheduler(jobstore)
+
+    assert job_states(scheduler) == expected
+    assert jobstore.redis.hlen(jobstore.snapshot_key) == 2
+
+
+def test_hybrid_jobstore_due_jobs_follow_run_times(redis_pool, start_scheduler):
+    jobstore = HybridJobStore(connection_pool=redis_pool)
+    scheduler = start_scheduler(jobstore)
+    add_jobs(scheduler, 3)
+    jobstore.pause_jobs(["job-0"])
+    now = datetime.now(timezone.utc) + timedelta(hours=2)
+
+    assert [job.id for job in jobstore.get_due_jobs(now)] == ["job-1", "job-2"]
+    assert jobstore.get_next_run_time() == scheduler.get_job("job-1").next_run_time
+
+
+def test_batch_jobstore_pauses_and_resumes(redis_pool, start_scheduler):
+    jobstore = BatchRedisJobStore(connection_pool=redis_pool)
+    scheduler = start_scheduler(jobstore)
+    add_jobs(scheduler, 3)
+
+    assert jobstore.pause_jobs(["job-0", "job-1", "missing"]) == {
+        "job-0": True,
+        "job-1": True,
+        "missing": False,
+    }
+    assert jobstore.redis.zcard(jobstore.run_times_key) == 1
+    assert scheduler.get_job("job-0").next_run_time is None
+
+    now = datetime.now(timezone.utc)
+    assert jobstore.resume_jobs(["job-0"], now) == {"job-0": True}
+    assert jobstore.redis.zcard(jobstore.run_times_key) == 2
+    assert scheduler.get_job("job-0").next_run_time is not None
+
+    assert jobstore.remove_jobs(["job-1", "missing"]) == {
+        "job-1": True,
+        "missing": False,
+    }
+    assert set(job_states(scheduler)) == {"job-0", "job-2"}
+
+
+def test_batch_jobstore_gives_up_on_a_job_that_keeps_changing(
+    redis_pool, start_scheduler
+):
+    jobstore = BatchRedisJobStore(connection_pool=redis_pool)
+    scheduler = start_scheduler(jobstore)
+    add_jobs(scheduler, 2)
+    reconstitute_job = jobstore._reconstitute_job
+    renames = []
+
+    def reconstitute_and_rename(job_state):
+        job = reconstitute_job(job_state)
+        if job.id == "job-0" and len(renames) == job.name.count("!"):
+            # Планировщик перезаписывает задачу между чтением и записью
+            renames.append(job.name)
+            scheduler.modify_job("job-0", name=f"{job.name}!")
+        return job
+
+    jobstore._reconstitute_job = reconstitute_and_rename
+    results = jobstore.pause_jobs(["job-0", "job-1"])
+    jobstore._reconstitute_job = reconstitute_job
+
+    assert results == {"job-0": False, "job-1": True}
+    assert len(renames) == jobstore.max_attempts
+    job = scheduler.get_job("job-0")
+    assert job.name.endswith("!" * jobstore.max_attempts)
+    assert job.next_run_time is not None
+    assert scheduler.get_job("job-1").next_run_time is None
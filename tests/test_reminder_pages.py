@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from src.dto.reminder import ReminderPageKey
+from src.enums.reminder import ReminderListFilter
+from src.services.reminder import ReminderService
+
+START = datetime(2025, 1, 1, 9, 0, 0, 123456, tzinfo=ZoneInfo("Europe/Moscow"))
+
+
+def test_page_key_round_trip_keeps_microseconds():
+    key = ReminderPageKey(START, 42)
+
+    decoded = ReminderPageKey.decode(key.encode())
+
+    assert decoded == key
+    assert decoded.start_datetime.tzinfo == timezone.utc
+
+
+class FakeReminderDAO:
+    """Keyset-выборка ReminderDAO над списком в памяти."""
+
+    def __init__(self, reminders):
+        self.reminders = sorted(reminders, key=ReminderPageKey.from_reminder)
+
+    async def get_all_user_reminders(
+        self, user_id, after=None, before=None, limit=None
+    ):
+        keys = [ReminderPageKey.from_reminder(r) for r in self.reminders]
+        if before is not None:
+            page = [r for r, k in zip(self.reminders, keys) if k < before]
+            return page[-limit:]
+        page = [r for r, k in zip(self.reminders, keys) if after is None or k > after]
+        return page[:limit]
+
+    get_active_user_reminders = get_all_user_reminders
+    get_disabled_user_reminders = get_all_user_reminders
+
+
+def get_page(reminders, after=None, before=None, page_size=2):
+    reminder_dao = FakeReminderDAO(reminders)
+    dao = SimpleNamespace(reminder=reminder_dao)
+    dao.read = dao
+    service = ReminderService(scheduler_service=None)
+    return asyncio.run(
+        service.get_user_reminders_page(
+            dao, 1, ReminderListFilter.ALL, page_size, after=after, before=before
+        )
+    )
+
+
+def make_reminders(count):
+    # Одинаковое время у соседних напоминаний: порядок задаёт id
+    return [
+        SimpleNamespace(id=index, start_datetime=START + timedelta(hours=index // 2))
+        for index in range(1, count + 1)
+    ]
+
+
+def ids(page):
+    return [reminder.id for reminder in page.reminders]
+
+
+def test_pages_forward_and_back():
+    reminders = make_reminders(5)
+
+    first = get_page(reminders)
+    assert (ids(first), first.has_prev, first.has_next) == ([1, 2], False, True)
+
+    after = ReminderPageKey.from_reminder(first.reminders[-1])
+    second = get_page(reminders, after=after)
+    assert (ids(second), second.has_prev, second.has_next) == ([3, 4], True, True)
+
+    after = ReminderPageKey.from_reminder(second.reminders[-1])
+    last = get_page(reminders, after=after)
+    assert (ids(last), last.has_prev, last.has_next) == ([5], True, False)
+
+    before = ReminderPageKey.from_reminder(second.reminders[0])
+    back = get_page(reminders, before=before)
+    assert (ids(back), back.has_prev, back.has_next) == ([1, 2], False, True)
+
+
+def test_single_page():
+    page = get_page(make_reminders(2))
+
+    assert (ids(page), page.has_prev, page.has_next) == ([1, 2], False, False)
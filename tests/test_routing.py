@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from src.database import routing
+from src.database.routing import RecentWriteTracker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_recent_write_expires_after_window(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(routing, "time", SimpleNamespace(monotonic=clock))
+    tracker = RecentWriteTracker(window=5.0)
+
+    assert not tracker.wrote_recently(1)
+    tracker.mark(1)
+    clock.now += 4.5
+    assert tracker.wrote_recently(1)
+    assert not tracker.wrote_recently(2)
+    clock.now += 0.5
+    assert not tracker.wrote_recently(1)
+
+
+def test_overflow_drops_only_expired_users(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(routing, "time", SimpleNamespace(monotonic=clock))
+    tracker = RecentWriteTracker(window=5.0, max_size=2)
+
+    tracker.mark(1)
+    tracker.mark(2)
+    clock.now += 10
+    tracker.mark(3)
+    tracker.mark(4)
+
+    assert sorted(tracker._written_at) == [3, 4]
+    assert tracker.wrote_recently(3) and tracker.wrote_recently(4)
@@ -0,0 +1,38 @@
+import pickle
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from apscheduler.triggers.cron import CronTrigger
+
+from src.utils.datetime_utils import CompactCronTrigger, build_trigger
+
+MSK = ZoneInfo("Europe/Moscow")
+NOW = datetime(2025, 3, 1, 12, 0, tzinfo=MSK)
+
+
+def fire_times(trigger, count=5):
+    times = []
+    previous = None
+    for _ in range(count):
+        previous = trigger.get_next_fire_time(previous, previous or NOW)
+        times.append(previous)
+    return times
+
+
+def test_compact_cron_trigger_survives_pickling():
+    trigger = build_trigger("cron", {"day_of_week": "mon,thu", "hour": 9, "minute": 30})
+
+    restored = pickle.loads(pickle.dumps(trigger))
+
+    assert isinstance(restored, CompactCronTrigger)
+    assert fire_times(restored) == fire_times(trigger)
+    assert str(restored) == str(trigger)
+
+
+def test_compact_cron_trigger_pickles_smaller_than_cron_trigger():
+    trigger_args = {"day": 15, "hour": 9, "minute": 30, "start_date": NOW}
+
+    compact = pickle.dumps(CompactCronTrigger(timezone="Europe/Moscow", **trigger_args))
+    full = pickle.dumps(CronTrigger(timezone="Europe/Moscow", **trigger_args))
+
+    assert len(compact) < len(full)